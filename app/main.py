@@ -4,6 +4,7 @@ Main application module.
 
 import os
 import logging
+import threading
 from fastapi import FastAPI, Request
 from fastapi.responses import HTMLResponse, FileResponse
 from fastapi.staticfiles import StaticFiles
@@ -12,6 +13,7 @@ import uvicorn
 
 from app.routers import main_router
 from app.utils.logging import setup_logging
+from app.utils.image import preload_image_libraries
 
 # Setup logging
 setup_logging()
@@ -39,6 +41,11 @@ app.include_router(main_router)
 # Mount static files
 app.mount("/static", StaticFiles(directory="static"), name="static")
 
+@app.on_event("startup")
+async def warm_up_imports():
+    """Import heavy image libraries in the background once the server is up."""
+    threading.Thread(target=preload_image_libraries, name="preload-imports", daemon=True).start()
+
 @app.get("/", response_class=HTMLResponse)
 async def read_root():
     """Serve the main HTML page."""
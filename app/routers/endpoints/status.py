@@ -33,7 +33,8 @@ app_state = {
         timeout=45
     ),
     "translation_count": 0,
-    "results": []
+    # Translation results keyed by id, in insertion order (oldest first)
+    "results": {}
 }
 
 @router.get("/status", response_model=AppStatus)
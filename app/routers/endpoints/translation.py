@@ -3,19 +3,19 @@ Translation endpoints
 """
 
 from fastapi import APIRouter, HTTPException, BackgroundTasks
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple
 import asyncio
 import uuid
 from datetime import datetime
 import time
 import threading
 
-from app.models import TranslationResult, MonitorControlRequest, TaskStatus
+from app.models import TranslationResult, MonitorControlRequest, TaskStatus, ErrorResponse
 from app.utils.logging import get_logger
 from app.services.screen_service import ScreenTranslationService
 from app.routers.endpoints.status import app_state
 from app.routers.router import manager
-from app.models.websocket import TranslationResultMessage, StatusUpdateMessage, TaskProgressMessage
+from app.models.websocket import TranslationResultMessage, StatusUpdateMessage, TaskProgressMessage, ErrorResponseMessage
 
 # Initialize logger
 logger = get_logger(__name__)
@@ -28,15 +28,36 @@ screen_service = ScreenTranslationService()
 
 # Background task flag
 translation_task_running = False
-translation_task_cancel = False
+
+# Set to stop the monitoring loop
+monitor_stop_event = asyncio.Event()
+
+# Set on start/pause/stop so the monitoring loop re-checks its state at once
+# instead of waiting out the current interval
+monitor_wake_event = asyncio.Event()
+
+# Maximum number of translation results kept; the oldest are evicted first
+MAX_STORED_RESULTS = 200
+
+# Monotonic start of the current task, used for drift-free elapsed times
+task_started_at = None
+
+# Seconds between elapsed-time resyncs sent to clients; the UI ticks locally in between
+TASK_TIMER_INTERVAL = 1.0
 
 # Use asyncio queue instead of threading queue
 ws_message_queue = None
 message_processor_task = None
 
+# Maximum number of pending WebSocket messages; the oldest is dropped when full
+WS_MESSAGE_QUEUE_SIZE = 64
+
 # Lock for message processor management
 message_processor_lock = asyncio.Lock()
 
+# Lock so forced and monitored translations never run concurrently
+translation_lock = asyncio.Lock()
+
 async def ensure_message_processor():
     """Ensure the message processor is running."""
     global message_processor_task, ws_message_queue
@@ -45,7 +66,7 @@ async def ensure_message_processor():
         if message_processor_task is None or message_processor_task.done():
             # Create new queue if needed
             if ws_message_queue is None:
-                ws_message_queue = asyncio.Queue()
+                ws_message_queue = asyncio.Queue(maxsize=WS_MESSAGE_QUEUE_SIZE)
             
             # Start new message processor task
             message_processor_task = asyncio.create_task(process_ws_messages())
@@ -53,15 +74,15 @@ async def ensure_message_processor():
 
 @router.get("/results", response_model=List[TranslationResult])
 async def get_results():
-    """Get all translation results."""
+    """Get all translation results, newest first."""
     logger.debug("Translation results requested")
-    return app_state["results"]
+    return list(reversed(app_state["results"].values()))
 
 @router.delete("/results")
 async def clear_results():
     """Clear all translation results."""
     logger.info("Clearing all translation results")
-    app_state["results"] = []
+    app_state["results"].clear()
     app_state["translation_count"] = 0
     return {"status": "success", "message": "All translation results cleared"}
 
@@ -70,14 +91,12 @@ async def delete_result(result_id: str):
     """Delete a specific translation result."""
     logger.info(f"Deleting translation result {result_id}")
     
-    # Find and remove the result
-    for i, result in enumerate(app_state["results"]):
-        if result.id == result_id:
-            app_state["results"].pop(i)
-            app_state["translation_count"] = len(app_state["results"])
-            return {"status": "success", "message": f"Translation result {result_id} deleted"}
+    # Remove the result by id
+    if app_state["results"].pop(result_id, None) is None:
+        raise HTTPException(status_code=404, detail=f"Translation result {result_id} not found")
     
-    raise HTTPException(status_code=404, detail=f"Translation result {result_id} not found")
+    app_state["translation_count"] = len(app_state["results"])
+    return {"status": "success", "message": f"Translation result {result_id} deleted"}
 
 @router.post("/monitor/control")
 async def control_monitoring(request: MonitorControlRequest, background_tasks: BackgroundTasks):
@@ -92,9 +111,11 @@ async def control_monitoring(request: MonitorControlRequest, background_tasks: B
         app_state["status"] = TaskStatus.RUNNING
         
         # Start the monitoring task if not already running
-        global translation_task_running, translation_task_cancel
+        global translation_task_running
         if not translation_task_running:
-            translation_task_cancel = False
+            monitor_stop_event.clear()
+            monitor_wake_event.clear()
+            screen_service.reset_cancel()
             background_tasks.add_task(monitoring_task)
             
     elif request.action == "pause":
@@ -104,7 +125,11 @@ async def control_monitoring(request: MonitorControlRequest, background_tasks: B
     elif request.action == "stop":
         app_state["monitoring_paused"] = True
         app_state["status"] = TaskStatus.IDLE
-        translation_task_cancel = True
+        monitor_stop_event.set()
+        screen_service.cancel()
+    
+    # Let a waiting monitoring loop pick up the change immediately
+    monitor_wake_event.set()
     
     # Broadcast status update
     await broadcast_status()
@@ -122,7 +147,8 @@ async def force_translation(background_tasks: BackgroundTasks):
     # Ensure message processor is running FIRST
     await ensure_message_processor()
     
-    # Start a one-time translation task
+    # Start a one-time translation task; this request overrides an earlier stop
+    screen_service.reset_cancel()
     background_tasks.add_task(one_time_translation_task)
     
     return {"status": "success", "message": "Translation started"}
@@ -132,8 +158,9 @@ async def stop_task():
     """Stop the current translation task."""
     logger.info("Stopping translation task")
     
-    global translation_task_cancel
-    translation_task_cancel = True
+    monitor_stop_event.set()
+    monitor_wake_event.set()
+    screen_service.cancel()
     
     # Update task state
     app_state["task_state"] = app_state["task_state"].copy(update={"is_running": False})
@@ -150,8 +177,26 @@ async def reset_cache():
     screen_service.reset_cache()
     return {"status": "success", "message": "Image cache reset"}
 
-async def one_time_translation_task():
-    """Run a one-time translation task."""
+def _monitoring_halted() -> bool:
+    """Whether monitoring has been stopped or paused."""
+    return monitor_stop_event.is_set() or app_state["monitoring_paused"]
+
+async def one_time_translation_task(from_monitor: bool = False):
+    """Run a one-time translation task, waiting for any in-flight one to finish.
+    
+    Args:
+        from_monitor: Whether the monitoring loop requested it, in which case a
+            pause also skips it
+    """
+    async with translation_lock:
+        # A stop (or pause) may have arrived while this run waited for the lock
+        if screen_service.cancel_event.is_set() or (from_monitor and _monitoring_halted()):
+            logger.info("Skipping translation requested before a stop or pause")
+            return
+        await _run_one_time_translation()
+
+async def _run_one_time_translation():
+    """Run a one-time translation of the selected window."""
     if app_state["selected_window"] is None:
         logger.warning("No window selected for one-time translation")
         return
@@ -163,7 +208,8 @@ async def one_time_translation_task():
     await _ensure_loop_reference()
     
     # Update task state
-    start_time = time.time()
+    global task_started_at
+    task_started_at = time.monotonic()
     app_state["task_state"] = app_state["task_state"].copy(update={
         "is_running": True,
         "elapsed_time": 0,
@@ -186,12 +232,16 @@ async def one_time_translation_task():
             translation_model_id=app_state["settings"].models.translation_model_id
         )
         
-        # Add result to results list (at the beginning)
-        app_state["results"].insert(0, result)
+        # Add result to results (newest last; get_results reverses the order)
+        results = app_state["results"]
+        results[result.id] = result
+        while len(results) > MAX_STORED_RESULTS:
+            del results[next(iter(results))]
         app_state["translation_count"] = len(app_state["results"])
         
     except Exception as e:
         logger.error(f"Translation error: {e}")
+        queue_error("Translation error", str(e))
     finally:
         # Cancel the timer task
         timer_task.cancel()
@@ -204,7 +254,7 @@ async def one_time_translation_task():
 
 async def monitoring_task():
     """Background task for continuous monitoring."""
-    global translation_task_running, translation_task_cancel
+    global translation_task_running
     
     translation_task_running = True
     try:
@@ -216,41 +266,53 @@ async def monitoring_task():
         # Store the main loop reference for callbacks
         await _ensure_loop_reference()
         
-        while not translation_task_cancel:
-            # Check if monitoring is paused
+        while not monitor_stop_event.is_set():
+            # Check if monitoring is paused; sleep until resumed or stopped
             if app_state["monitoring_paused"]:
-                await asyncio.sleep(1)
+                if await _wait_for_wakeup(None):
+                    break
                 continue
             
             # Check if a window is selected
             if app_state["selected_window"] is None:
                 logger.warning("No window selected for monitoring")
-                await asyncio.sleep(1)
+                if await _wait_for_wakeup(1):
+                    break
                 continue
             
             # Check if we should process a new image
-            if screen_service.should_process_new_image(
+            if await screen_service.check_for_new_image(
                 app_state["selected_window"].hwnd,
                 app_state["settings"].similarity_threshold
             ):
+                # The check runs off the loop, so a stop or pause may have come in meanwhile
+                if _monitoring_halted():
+                    continue
+                
                 # Run one-time translation
-                await one_time_translation_task()
+                await one_time_translation_task(from_monitor=True)
             
             # Wait for the next check interval
-            await asyncio.sleep(app_state["settings"].check_interval)
+            if await _wait_for_wakeup(app_state["settings"].check_interval):
+                break
     
     except Exception as e:
         logger.error(f"Monitoring task error: {e}")
+        queue_error("Monitoring task error", str(e))
     finally:
         translation_task_running = False
         logger.info("Monitoring task stopped")
 
+def update_elapsed_time():
+    """Refresh the task's elapsed time from its monotonic start."""
+    if task_started_at is not None:
+        elapsed = time.monotonic() - task_started_at
+        app_state["task_state"] = app_state["task_state"].copy(update={"elapsed_time": elapsed})
+
 def stream_translation_callback(result: TranslationResult):
     """Callback for streaming translation updates."""
     # Update task state with elapsed time
-    if app_state["task_state"].start_time:
-        elapsed = (datetime.now() - app_state["task_state"].start_time).total_seconds()
-        app_state["task_state"] = app_state["task_state"].copy(update={"elapsed_time": elapsed})
+    update_elapsed_time()
     
     # Get the event loop safely - this might be called from any thread
     try:
@@ -267,13 +329,10 @@ def stream_translation_callback(result: TranslationResult):
         
         # Schedule the queue operations to run in the event loop
         if ws_message_queue is not None:
-            # Use call_soon_threadsafe to safely schedule from any thread
-            loop.call_soon_threadsafe(
-                lambda: asyncio.create_task(queue_translation_result(result))
-            )
-            loop.call_soon_threadsafe(
-                lambda: asyncio.create_task(queue_task_progress())
-            )
+            # Use call_soon_threadsafe to safely schedule from any thread. The
+            # puts never block, so they run as plain callbacks instead of tasks.
+            loop.call_soon_threadsafe(queue_translation_result, result)
+            loop.call_soon_threadsafe(queue_task_progress)
     except Exception as e:
         logger.error(f"Error in stream_translation_callback: {e}")
 
@@ -287,6 +346,15 @@ def _store_main_loop():
     except RuntimeError:
         logger.warning("No running event loop to store")
 
+async def _wait_for_wakeup(timeout: Optional[float]) -> bool:
+    """Wait up to timeout seconds (forever if None) or until woken; return True if a stop was requested."""
+    try:
+        await asyncio.wait_for(monitor_wake_event.wait(), timeout)
+    except asyncio.TimeoutError:
+        pass
+    monitor_wake_event.clear()
+    return monitor_stop_event.is_set()
+
 # Call this when starting async operations
 async def _ensure_loop_reference():
     """Ensure we have a reference to the main event loop."""
@@ -298,24 +366,90 @@ async def _ensure_loop_reference():
         except RuntimeError:
             logger.warning("No running event loop to store")
 
-async def queue_translation_result(result: TranslationResult):
+def _is_superseded_message(message: Tuple[str, Any]) -> bool:
+    """Whether a queued message only carries state that a later one replaces."""
+    message_type, data = message
+    if message_type in ("task_progress", "status"):
+        return True
+    return message_type == "translation_result" and data.is_streaming
+
+def put_ws_message(message_type: str, data: Any):
+    """Queue a WebSocket message, making room by coalescing pending ones if the queue is full.
+    
+    Superseded snapshots are dropped first; errors and final translation
+    results are never dropped to make room.
+    """
+    message = (message_type, data)
+    try:
+        ws_message_queue.put_nowait(message)
+        return
+    except asyncio.QueueFull:
+        pass
+    
+    # Take out everything pending and keep only the latest state per result
+    pending = []
+    while not ws_message_queue.empty():
+        pending.append(ws_message_queue.get_nowait())
+        ws_message_queue.task_done()
+    pending = _latest_messages(pending + [message])
+    
+    # Still full: drop the oldest streaming snapshots or progress updates
+    while len(pending) > WS_MESSAGE_QUEUE_SIZE:
+        droppable = next((i for i, m in enumerate(pending) if _is_superseded_message(m)), None)
+        if droppable is None:
+            logger.warning(f"WebSocket message queue full, dropping {pending[-1][0]} message")
+            pending.pop()
+        else:
+            del pending[droppable]
+    
+    for pending_message in pending:
+        ws_message_queue.put_nowait(pending_message)
+
+def queue_translation_result(result: TranslationResult):
     """Queue a translation result for WebSocket broadcast."""
     global ws_message_queue
     if ws_message_queue is not None:
         try:
-            await ws_message_queue.put(("translation_result", result))
+            put_ws_message("translation_result", result)
         except Exception as e:
             logger.error(f"Error queueing translation result: {e}")
 
-async def queue_task_progress():
+def queue_task_progress():
     """Queue a task progress update for WebSocket broadcast."""
     global ws_message_queue
     if ws_message_queue is not None:
         try:
-            await ws_message_queue.put(("task_progress", app_state["task_state"]))
+            put_ws_message("task_progress", app_state["task_state"])
         except Exception as e:
             logger.error(f"Error queueing task progress: {e}")
 
+def queue_error(error: str, detail: Optional[str] = None):
+    """Queue an error notification for WebSocket broadcast."""
+    global ws_message_queue
+    if ws_message_queue is not None:
+        try:
+            put_ws_message("error", ErrorResponse(error=error, detail=detail))
+        except Exception as e:
+            logger.error(f"Error queueing error notification: {e}")
+
+def _latest_messages(messages: List[Tuple[str, Any]]) -> List[Tuple[str, Any]]:
+    """Collapse a burst of queued messages so only the latest state is broadcast.
+    
+    Streaming updates carry the full text so far, so for each translation result
+    only the newest snapshot matters; progress and status messages always read
+    the current app state. Errors are kept as-is. First-seen order is preserved.
+    """
+    latest: Dict[Any, Tuple[str, Any]] = {}
+    for index, (message_type, data) in enumerate(messages):
+        if message_type == "translation_result":
+            key = (message_type, data.id)
+        elif message_type in ("task_progress", "status"):
+            key = message_type
+        else:
+            key = index
+        latest[key] = (message_type, data)
+    return list(latest.values())
+
 async def process_ws_messages():
     """Process WebSocket messages from the queue."""
     global ws_message_queue
@@ -325,25 +459,27 @@ async def process_ws_messages():
     try:
         while True:
             try:
-                # Wait for a message with a reasonable timeout
-                try:
-                    message_type, data = await asyncio.wait_for(
-                        ws_message_queue.get(), timeout=1.0
-                    )
-                except asyncio.TimeoutError:
-                    # No message in queue, continue
-                    continue
+                # Block until a producer queues a message (no idle polling)
+                messages = [await ws_message_queue.get()]
                 
-                # Process the message based on its type
-                if message_type == "translation_result":
-                    await broadcast_translation_result(data)
-                elif message_type == "task_progress":
-                    await broadcast_task_progress()
-                elif message_type == "status":
-                    await broadcast_status()
+                # Drain whatever else queued up meanwhile in the same pass
+                while not ws_message_queue.empty():
+                    messages.append(ws_message_queue.get_nowait())
                 
-                # Mark the task as done
-                ws_message_queue.task_done()
+                for message_type, data in _latest_messages(messages):
+                    # Process the message based on its type
+                    if message_type == "translation_result":
+                        await broadcast_translation_result(data)
+                    elif message_type == "task_progress":
+                        await broadcast_task_progress()
+                    elif message_type == "status":
+                        await broadcast_status()
+                    elif message_type == "error":
+                        await broadcast_error(data)
+                
+                # Mark the drained messages as done
+                for _ in messages:
+                    ws_message_queue.task_done()
                 
             except Exception as e:
                 logger.error(f"Error processing WebSocket message: {e}")
@@ -389,6 +525,11 @@ async def broadcast_status():
 async def get_status_for_broadcast():
     """Get the current status for broadcasting."""
     from app.routers.endpoints.status import get_status
+    
+    # The timer only refreshes elapsed time once a second; send the current
+    # value so clients do not re-anchor their local clock to a stale one
+    if app_state["task_state"].is_running:
+        update_elapsed_time()
     return await get_status()
 
 async def broadcast_task_progress():
@@ -398,13 +539,29 @@ async def broadcast_task_progress():
         if not manager.active_connections:
             logger.debug("No active WebSocket connections for task progress")
             return
-            
+        
+        if app_state["task_state"].is_running:
+            update_elapsed_time()
         message = TaskProgressMessage(data=app_state["task_state"])
         await manager.broadcast(message.model_dump(mode="json"))
         logger.debug(f"Broadcasted task progress to {len(manager.active_connections)} connections")
     except Exception as e:
         logger.error(f"Error broadcasting task progress: {e}")
 
+async def broadcast_error(error: ErrorResponse):
+    """Broadcast an error notification."""
+    try:
+        # Check if we have active connections
+        if not manager.active_connections:
+            logger.debug("No active WebSocket connections for error")
+            return
+            
+        message = ErrorResponseMessage(data=error)
+        await manager.broadcast(message.model_dump(mode="json"))
+        logger.debug(f"Broadcasted error to {len(manager.active_connections)} connections")
+    except Exception as e:
+        logger.error(f"Error broadcasting error notification: {e}")
+
 async def update_task_timer():
     """Periodically update the task timer and broadcast progress."""
     global ws_message_queue
@@ -412,19 +569,18 @@ async def update_task_timer():
     try:
         while app_state["task_state"].is_running:
             # Update elapsed time if task is running
-            if app_state["task_state"].start_time:
-                elapsed = (datetime.now() - app_state["task_state"].start_time).total_seconds()
-                app_state["task_state"] = app_state["task_state"].copy(update={"elapsed_time": elapsed})
+            if task_started_at is not None:
+                update_elapsed_time()
                 
                 # Queue task progress message
                 if ws_message_queue is not None:
                     try:
-                        await ws_message_queue.put(("task_progress", app_state["task_state"]))
+                        put_ws_message("task_progress", app_state["task_state"])
                     except Exception as e:
                         logger.error(f"Error queueing timer update: {e}")
             
-            # Update every 0.1 seconds for smooth timer display
-            await asyncio.sleep(0.1)
+            # Clients interpolate between updates, so an occasional resync is enough
+            await asyncio.sleep(TASK_TIMER_INTERVAL)
     except asyncio.CancelledError:
         # Task was cancelled, which is expected
         pass
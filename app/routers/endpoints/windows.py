@@ -4,12 +4,11 @@ Window management endpoints.
 
 from fastapi import APIRouter, HTTPException
 from typing import List, Dict, Any
-import win32gui
 import asyncio
 
 from app.models import WindowInfo, WindowListResponse, WindowSelectionRequest
 from app.utils.logging import get_logger
-from app.utils.window import is_window_visible, get_window_title, get_desktop_window
+from app.utils.window import enum_visible_windows, get_window_title, get_desktop_window, reset_capture_methods
 from app.routers.endpoints.status import app_state
 
 # Initialize logger
@@ -18,16 +17,8 @@ logger = get_logger(__name__)
 # Create router
 router = APIRouter(tags=["windows"])
 
-def enum_windows_callback(hwnd, windows):
-    """Callback for EnumWindows."""
-    if is_window_visible(hwnd):
-        title = get_window_title(hwnd)
-        if title:  # Only include windows with titles
-            windows.append(WindowInfo(
-                hwnd=hwnd,
-                title=title,
-                is_visible=True
-            ))
+# Titles from the most recent window enumeration, keyed by hwnd
+window_titles: Dict[int, str] = {}
 
 @router.get("/windows", response_model=WindowListResponse)
 async def get_windows():
@@ -45,9 +36,13 @@ async def get_windows():
 
 def _get_windows_sync():
     """Synchronous function to get windows list."""
-    windows = []
-    win32gui.EnumWindows(enum_windows_callback, windows)
-    return windows
+    global window_titles
+    windows = enum_visible_windows()
+    window_titles = dict(windows)
+    return [
+        WindowInfo(hwnd=hwnd, title=title, is_visible=True)
+        for hwnd, title in windows
+    ]
 
 @router.post("/window/select")
 async def select_window(request: WindowSelectionRequest):
@@ -58,10 +53,15 @@ async def select_window(request: WindowSelectionRequest):
         title = "Full Screen"
     else:
         hwnd = request.hwnd
-        title = request.title or get_window_title(hwnd)
+        title = request.title or window_titles.get(hwnd) or get_window_title(hwnd)
     
     logger.info(f"Selected window: {title} (hwnd: {hwnd})")
     
+    # A newly selected window gets its capture method probed afresh
+    previous = app_state["selected_window"]
+    if previous is None or previous.hwnd != hwnd:
+        reset_capture_methods()
+    
     # Update app state
     app_state["selected_window"] = WindowInfo(
         hwnd=hwnd,
@@ -2,9 +2,9 @@
 Service for managing models and their availability.
 """
 
-import requests
 from typing import List, Dict, Any, Optional
 from app.utils.logging import get_logger, log_function_call
+from app.utils.http import http_session, loads_json
 
 # Initialize logger
 logger = get_logger(__name__)
@@ -27,9 +27,9 @@ class ModelService:
             List of model information dictionaries
         """
         try:
-            response = requests.get(f"{self.lm_studio_api_url}/models", timeout=5)
+            response = http_session.get(f"{self.lm_studio_api_url}/models", timeout=5)
             response.raise_for_status()
-            models = response.json().get("data", [])
+            models = loads_json(response.content).get("data", [])
             logger.info(f"Retrieved {len(models)} models from API")
             return models
         except Exception as e:
@@ -3,19 +3,38 @@ OCR service for extracting text from images.
 """
 
 from abc import ABC, abstractmethod
-import requests
 import base64
+import threading
+from typing import Optional
 from app.utils.logging import get_logger, log_function_call
+from app.utils.http import open_stream, loads_json
+from app.utils.image import ENCODE_MIME_TYPE
 
 # Initialize logger
 logger = get_logger(__name__)
 
+# Upper bound on OCR output. On-screen text is well below this; the cap mainly
+# stops a vision model stuck in a repetition loop from generating for minutes.
+OCR_MAX_TOKENS = 2048
+
+# Instruction sent with every screenshot
+OCR_PROMPT = (
+    "Extract all visible text from the image. Include all text in the original language."
+    "\n\n"
+    "Respond ONLY with the extracted text, no explanations or formatting."
+)
+
+# OCR providers by model ID, so each request reuses its provider's prebuilt payload parts
+_providers = {}
+
 class OCRProvider(ABC):
     """Abstract base class for OCR providers"""
     
     @abstractmethod
-    def extract_text(self, image_b64: str, timeout: int = 45) -> str:
-        """Extract text from base64 encoded image"""
+    def extract_text(
+        self, image_b64: str, timeout: int = 45, cancel_event: Optional[threading.Event] = None
+    ) -> str:
+        """Extract text from base64 encoded image, giving up early once cancel_event is set"""
         pass
 
 class LLMBasedOCR(OCRProvider):
@@ -24,43 +43,66 @@ class LLMBasedOCR(OCRProvider):
     def __init__(self, model_id: str, api_url: str = "http://127.0.0.1:7860/v1/chat/completions"):
         self.model_id = model_id
         self.api_url = api_url
+        
+        # Only the image changes between requests; the prompt part is built once
+        self._prompt_part = {"type": "text", "text": OCR_PROMPT}
         logger.info(f"Initialized LLMBasedOCR with model {model_id}")
     
     @log_function_call
-    def extract_text(self, image_b64: str, timeout: int = 45) -> str:
-        prompt = (
-            "Extract all visible text from the image. Include all text in the original language."
-            "\n\n"
-            "Respond ONLY with the extracted text, no explanations or formatting."
-        )
+    def extract_text(
+        self, image_b64: str, timeout: int = 45, cancel_event: Optional[threading.Event] = None
+    ) -> str:
         payload = {
             "model": self.model_id,
             "messages": [{
                 "role": "user",
                 "content": [
-                    {"type": "image_url", "image_url": {"url": f"data:image/png;base64,{image_b64}"}},
-                    {"type": "text", "text": prompt},
+                    {"type": "image_url", "image_url": {"url": f"data:{ENCODE_MIME_TYPE};base64,{image_b64}"}},
+                    self._prompt_part,
                 ]
             }],
             "temperature": 0.1,
-            "max_tokens": 6000,
+            "max_tokens": OCR_MAX_TOKENS,
+            # Streamed so a cancel is noticed between chunks, and so cancel()
+            # can close the response while the model is still working
+            "stream": True,
         }
         try:
             logger.debug(f"Sending OCR request to {self.api_url} with model {self.model_id}")
-            resp = requests.post(self.api_url, json=payload, timeout=timeout)
-            resp.raise_for_status()
-            content = resp.json()["choices"][0]["message"]["content"].strip()
+            parts = []
+            with open_stream(self.api_url, payload, timeout) as resp:
+                resp.raise_for_status()
+                for line in resp.iter_lines():
+                    if cancel_event is not None and cancel_event.is_set():
+                        logger.info("OCR cancelled")
+                        return ""
+                    if not line.startswith(b"data: "):
+                        continue
+                    data = line[6:]
+                    if data == b"[DONE]":
+                        break
+                    choices = loads_json(data).get("choices")
+                    if choices:
+                        delta = choices[0].get("delta", {}).get("content")
+                        if delta:
+                            parts.append(delta)
+            content = "".join(parts).strip()
             logger.debug(f"OCR successful, extracted {len(content)} characters")
             return content
         except Exception as e:
-            logger.error(f"OCR API error: {e}")
+            if cancel_event is not None and cancel_event.is_set():
+                logger.info("OCR cancelled")
+            else:
+                logger.error(f"OCR API error: {e}")
             return ""
 
 class TesseractOCR(OCRProvider):
     """OCR provider that uses Tesseract"""
     
     @log_function_call
-    def extract_text(self, image_b64: str, timeout: int = 45) -> str:
+    def extract_text(
+        self, image_b64: str, timeout: int = 45, cancel_event: Optional[threading.Event] = None
+    ) -> str:
         # Placeholder for future implementation
         # Would use pytesseract to extract text
         logger.warning("Tesseract OCR not implemented yet")
@@ -71,17 +113,25 @@ def create_ocr_provider(model_id: str) -> OCRProvider:
     """
     Factory function to create appropriate OCR provider.
     
+    Providers are created once per model ID and reused.
+    
     Args:
         model_id: The model ID to use for OCR
         
     Returns:
         An OCR provider instance
     """
+    provider = _providers.get(model_id)
+    if provider is not None:
+        return provider
+    
     # Special case for Tesseract
     if model_id.lower() == "tesseract":
         logger.info("Creating Tesseract OCR provider")
-        return TesseractOCR()
+        provider = TesseractOCR()
     else:
         # All other models are assumed to be LLM-based
         logger.info(f"Creating LLM-based OCR provider with model {model_id}")
-        return LLMBasedOCR(model_id)
+        provider = LLMBasedOCR(model_id)
+    _providers[model_id] = provider
+    return provider
@@ -3,16 +3,24 @@ Service for capturing and translating screen content
 """
 
 import asyncio
+import threading
 import time
 import uuid
+from collections import OrderedDict
 from datetime import datetime
-from typing import Optional, Callable, Dict, Any
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Callable, Dict, Any, Tuple
 from PIL import Image
-import threading
 
 from app.utils.logging import get_logger, log_function_call
-from app.utils.window import screenshot_window, is_window_visible
-from app.utils.image import encode_image, images_are_similar
+from app.utils.http import close_streams
+from app.utils.window import screenshot_window, capture_window, is_window_capturable, reset_capture_methods
+from app.utils.image import (
+    SimilarityReference,
+    encode_image,
+    images_are_similar,
+    similarity_reference,
+)
 from app.services.ocr_service import create_ocr_provider
 from app.services.translator_service import translate_text
 from app.models.responses import TranslationResult
@@ -20,13 +28,38 @@ from app.models.responses import TranslationResult
 # Initialize logger
 logger = get_logger(__name__)
 
+# A frame captured by the change check is reused for translation if it is at most this old (seconds)
+FRAME_REUSE_MAX_AGE = 1.0
+
+# Number of recent (model, OCR text) -> translation pairs kept for reuse
+TRANSLATION_CACHE_SIZE = 256
+
 class ScreenTranslationService:
     """Service for capturing and translating screen content."""
     
     def __init__(self):
-        self.last_image = None
+        self.last_reference = None
         self.last_hwnd = None
         
+        # Digest of the raw pixels of the last frame judged unchanged; an
+        # identical capture is skipped before the similarity check
+        self.last_frame_digest = None
+        
+        # (hwnd, captured_at, screenshot, reference) of the frame that last passed the change check
+        self.pending_frame = None
+        
+        # One long-lived worker runs capture, OCR and translation so requests
+        # never spawn extra threads and blocking work stays serialized
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="screen-translation")
+        
+        # Set to abort the in-flight translation. It stays set until a new run
+        # is explicitly started (reset_cancel), so a stop that arrives while a
+        # run is still queued is not lost.
+        self.cancel_event = threading.Event()
+        
+        # Recently completed translations keyed by (model, OCR text), least recently used first
+        self.translation_cache: "OrderedDict[Tuple[str, str], str]" = OrderedDict()
+        
     @log_function_call
     async def translate_screen(
         self,
@@ -49,7 +82,7 @@ class ScreenTranslationService:
         Returns:
             TranslationResult object with the translation
         """
-        start_time = time.time()
+        start_time = time.monotonic()
         translation_id = str(uuid.uuid4())
         
         # Get the current event loop for callback scheduling
@@ -69,17 +102,19 @@ class ScreenTranslationService:
             stream_callback(result)
         
         try:
-            # Take screenshot
-            logger.info(f"Taking screenshot of window {hwnd}")
+            # Reuse the frame the change check just captured, or take a new screenshot
             loop = asyncio.get_event_loop()
-            screenshot = await loop.run_in_executor(None, screenshot_window, hwnd)
+            screenshot, frame_reference = self._take_pending_frame(hwnd)
+            if screenshot is None:
+                logger.info(f"Taking screenshot of window {hwnd}")
+                screenshot = await loop.run_in_executor(self.executor, screenshot_window, hwnd)
             
             # Update result to OCR stage
             result = TranslationResult(
                 id=translation_id,
-                translation="",
+                translation="Running OCR...",
                 timestamp=datetime.now(),
-                processing_time=time.time() - start_time,
+                processing_time=time.monotonic() - start_time,
                 is_streaming=True,
                 stage="ocr"
             )
@@ -88,61 +123,37 @@ class ScreenTranslationService:
                 stream_callback(result)
             
             # Encode image
-            img_b64 = await loop.run_in_executor(None, encode_image, screenshot)
+            img_b64 = await loop.run_in_executor(self.executor, encode_image, screenshot)
             
             # Extract text using OCR
             logger.info(f"Extracting text using OCR model {ocr_model_id}")
             ocr_provider = create_ocr_provider(ocr_model_id)
             
-            # Create a safe callback wrapper for OCR progress updates
-            def safe_ocr_progress_callback():
-                def update_progress():
-                    while not stop_event.is_set():
-                        current_time = time.time()
-                        total_elapsed = current_time - start_time
-                        
-                        # Create progress result
-                        progress_result = TranslationResult(
-                            id=translation_id,
-                            translation="Running OCR...",
-                            timestamp=datetime.now(),
-                            processing_time=total_elapsed,
-                            is_streaming=True,
-                            stage="ocr"
-                        )
-                        
-                        # Schedule callback in main thread
-                        if stream_callback:
-                            try:
-                                main_loop.call_soon_threadsafe(lambda: stream_callback(progress_result))
-                            except Exception as e:
-                                logger.error(f"Error scheduling OCR progress callback: {e}")
-                                break
-                        
-                        time.sleep(0.1)
-                
-                # Create stop event and start thread
-                stop_event = threading.Event()
-                progress_thread = threading.Thread(target=update_progress, daemon=True)
-                progress_thread.start()
-                
-                return stop_event, progress_thread
-            
-            # Start OCR with progress updates
-            stop_event, progress_thread = safe_ocr_progress_callback()
+            # Run OCR. Elapsed-time updates while it runs come from the task
+            # timer, so no separate progress loop is needed here.
+            extracted_text = await loop.run_in_executor(
+                self.executor, 
+                ocr_provider.extract_text, 
+                img_b64, 
+                timeout,
+                self.cancel_event
+            )
             
-            try:
-                # Run OCR
-                extracted_text = await loop.run_in_executor(
-                    None, 
-                    ocr_provider.extract_text, 
-                    img_b64, 
-                    timeout
+            if self.cancel_event.is_set():
+                logger.info("Screen translation cancelled during OCR")
+                result = TranslationResult(
+                    id=translation_id,
+                    translation="Translation cancelled",
+                    timestamp=datetime.now(),
+                    processing_time=time.monotonic() - start_time,
+                    is_streaming=False,
+                    stage="cancelled"
                 )
-            finally:
-                # Stop progress updates
-                stop_event.set()
-                progress_thread.join(timeout=1.0)
+                
+                if stream_callback:
+                    stream_callback(result)
+                
+                return result
             
             if not extracted_text:
                 logger.warning("No text extracted from image")
@@ -150,7 +161,7 @@ class ScreenTranslationService:
                     id=translation_id,
                     translation="No text detected in image",
                     timestamp=datetime.now(),
-                    processing_time=time.time() - start_time,
+                    processing_time=time.monotonic() - start_time,
                     is_streaming=False,
                     stage="error"
                 )
@@ -160,83 +171,104 @@ class ScreenTranslationService:
                 
                 return result
             
-            # Update result to translating stage
-            result = TranslationResult(
-                id=translation_id,
-                translation="",
-                timestamp=datetime.now(),
-                processing_time=time.time() - start_time,
-                is_streaming=True,
-                stage="translating"
-            )
-            
-            if stream_callback:
-                stream_callback(result)
-            
-            # Create a safe translation callback wrapper
-            def safe_translation_callback(partial_translation: str):
-                current_time = time.time()
-                processing_time = current_time - start_time
-                
-                # Update the result with the partial translation
-                progress_result = TranslationResult(
+            # Text seen recently (menus, repeated dialogue) is served from the
+            # cache instead of being translated again
+            cache_key = (translation_model_id, extracted_text)
+            final_translation = self._get_cached_translation(cache_key)
+            if final_translation is not None:
+                logger.info("Reusing cached translation for repeated text")
+            else:
+                # Update result to translating stage
+                result = TranslationResult(
                     id=translation_id,
-                    translation=partial_translation,
+                    translation="",
                     timestamp=datetime.now(),
-                    processing_time=processing_time,
+                    processing_time=time.monotonic() - start_time,
                     is_streaming=True,
                     stage="translating"
                 )
                 
-                # Schedule callback in main thread safely
                 if stream_callback:
-                    try:
-                        main_loop.call_soon_threadsafe(lambda: stream_callback(progress_result))
-                    except Exception as e:
-                        logger.error(f"Error scheduling translation callback: {e}")
-            
-            # Run translation with streaming
-            if stream_callback:
-                # Execute translation in thread pool with safe callback
-                final_translation = await loop.run_in_executor(
-                    None,
-                    lambda: translate_text(
-                        extracted_text,
-                        timeout,
-                        safe_translation_callback,
-                        translation_model_id
+                    stream_callback(result)
+                
+                # Create a safe translation callback wrapper
+                def safe_translation_callback(partial_translation: str):
+                    processing_time = time.monotonic() - start_time
+                    
+                    # Update the result with the partial translation
+                    progress_result = TranslationResult(
+                        id=translation_id,
+                        translation=partial_translation,
+                        timestamp=datetime.now(),
+                        processing_time=processing_time,
+                        is_streaming=True,
+                        stage="translating"
                     )
-                )
-            else:
-                # Non-streaming translation
-                final_translation = await loop.run_in_executor(
-                    None,
-                    lambda: translate_text(
-                        extracted_text,
-                        timeout,
-                        None,
-                        translation_model_id
+                    
+                    # Schedule callback in main thread safely
+                    if stream_callback:
+                        try:
+                            main_loop.call_soon_threadsafe(lambda: stream_callback(progress_result))
+                        except Exception as e:
+                            logger.error(f"Error scheduling translation callback: {e}")
+                
+                # Run translation with streaming
+                if stream_callback:
+                    # Execute translation in thread pool with safe callback
+                    final_translation = await loop.run_in_executor(
+                        self.executor,
+                        lambda: translate_text(
+                            extracted_text,
+                            timeout,
+                            safe_translation_callback,
+                            translation_model_id,
+                            self.cancel_event
+                        )
+                    )
+                else:
+                    # Non-streaming translation
+                    final_translation = await loop.run_in_executor(
+                        self.executor,
+                        lambda: translate_text(
+                            extracted_text,
+                            timeout,
+                            None,
+                            translation_model_id,
+                            self.cancel_event
+                        )
                     )
-                )
             
-            processing_time = time.time() - start_time
+            processing_time = time.monotonic() - start_time
+            cancelled = self.cancel_event.is_set()
             
             # Final update with completed translation
             result = TranslationResult(
                 id=translation_id,
-                translation=final_translation if final_translation else "Translation failed",
+                translation=final_translation if final_translation else (
+                    "Translation cancelled" if cancelled else "Translation failed"
+                ),
                 timestamp=datetime.now(),
                 processing_time=processing_time,
                 is_streaming=False,
-                stage="completed"
+                stage="cancelled" if cancelled else "completed"
             )
             
             if stream_callback:
                 stream_callback(result)
             
-            # Cache the image and window handle
-            self.last_image = screenshot
-            self.last_hwnd = hwnd
+            if not cancelled and final_translation:
+                self._cache_translation(cache_key, final_translation)
+            
+            # Cache the image's similarity data and window handle, unless the
+            # frame was only partially translated and should be picked up again.
+            # The change check's thumbnail is reused when the frame came from
+            # it, so the screenshot is only reduced once.
+            if not cancelled:
+                if frame_reference is None:
+                    frame_reference = await loop.run_in_executor(self.executor, similarity_reference, screenshot)
+                self.last_reference = frame_reference
+                self.last_hwnd = hwnd
+                self.last_frame_digest = None
             
             return result
             
@@ -248,7 +280,7 @@ class ScreenTranslationService:
                 id=translation_id,
                 translation=f"Error: {str(e)}",
                 timestamp=datetime.now(),
-                processing_time=time.time() - start_time,
+                processing_time=time.monotonic() - start_time,
                 is_streaming=False,
                 stage="error"
             )
@@ -270,39 +302,136 @@ class ScreenTranslationService:
         Returns:
             True if the image should be processed, False otherwise
         """
-        # If no previous image or different window, always process
-        if self.last_image is None or self.last_hwnd != hwnd:
-            logger.debug("No previous image or different window, processing new image")
-            return True
+        self.pending_frame = None
         
-        # If window is not visible, don't process
-        if not is_window_visible(hwnd):
+        # If window is hidden, minimized or cloaked, there is nothing to capture
+        if not is_window_capturable(hwnd):
             logger.debug("Window is not visible, skipping processing")
             return False
         
+        # If no previous image or different window, always process
+        if self.last_reference is None or self.last_hwnd != hwnd:
+            logger.debug("No previous image or different window, processing new image")
+            return True
+        
         # Take a new screenshot
         try:
-            new_screenshot = screenshot_window(hwnd)
+            new_screenshot, new_digest = capture_window(hwnd)
+            
+            # Fastest path: a byte-identical frame cannot have changed
+            if new_digest is not None and new_digest == self.last_frame_digest:
+                logger.debug("New image is identical to previous, skipping processing")
+                return False
             
-            # Compare with previous image
+            # Compare the frame's grayscale thumbnail with the previous one. It is
+            # kept with the pending frame, so a change is only reduced once.
+            new_reference = similarity_reference(new_screenshot)
             is_similar = images_are_similar(
-                new_screenshot, self.last_image, similarity_threshold
+                new_reference, self.last_reference, similarity_threshold
             )
             
             if is_similar:
                 logger.debug("New image is similar to previous, skipping processing")
+                self.last_frame_digest = new_digest
                 return False
             else:
                 logger.debug("New image is different from previous, processing")
+                self.pending_frame = (hwnd, time.monotonic(), new_screenshot, new_reference)
                 return True
                 
         except Exception as e:
             logger.error(f"Error checking image similarity: {e}")
             return True  # Process on error to be safe
     
+    async def check_for_new_image(self, hwnd: int, similarity_threshold: float = 0.90) -> bool:
+        """
+        Run should_process_new_image on the service's worker thread.
+        
+        The change check captures and reduces a full frame, so it is kept off
+        the event loop, which keeps serving WebSocket traffic meanwhile.
+        
+        Args:
+            hwnd: Window handle to check
+            similarity_threshold: Threshold for image similarity
+            
+        Returns:
+            True if the image should be processed, False otherwise
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self.executor, self.should_process_new_image, hwnd, similarity_threshold
+        )
+    
+    def _take_pending_frame(
+        self, hwnd: int
+    ) -> Tuple[Optional[Image.Image], Optional[SimilarityReference]]:
+        """
+        Hand over the frame captured by the last change check, if still fresh.
+        
+        Args:
+            hwnd: Window handle about to be translated
+            
+        Returns:
+            Tuple of (screenshot, reference), or (None, None) if there is no
+            usable frame
+        """
+        pending, self.pending_frame = self.pending_frame, None
+        if pending is None:
+            return None, None
+        
+        frame_hwnd, captured_at, screenshot, frame_reference = pending
+        if frame_hwnd != hwnd or time.monotonic() - captured_at > FRAME_REUSE_MAX_AGE:
+            return None, None
+        
+        logger.debug("Reusing frame captured by the change check")
+        return screenshot, frame_reference
+    
+    def _get_cached_translation(self, key: Tuple[str, str]) -> Optional[str]:
+        """
+        Look up a recent translation and mark it as recently used.
+        
+        Args:
+            key: (translation model ID, OCR text)
+            
+        Returns:
+            Cached translation, or None if the text was not translated recently
+        """
+        translation = self.translation_cache.get(key)
+        if translation is not None:
+            self.translation_cache.move_to_end(key)
+        return translation
+    
+    def _cache_translation(self, key: Tuple[str, str], translation: str):
+        """
+        Remember a completed translation, evicting the least recently used one when full.
+        
+        Args:
+            key: (translation model ID, OCR text)
+            translation: Completed translation
+        """
+        self.translation_cache[key] = translation
+        self.translation_cache.move_to_end(key)
+        if len(self.translation_cache) > TRANSLATION_CACHE_SIZE:
+            self.translation_cache.popitem(last=False)
+    
+    @log_function_call
+    def cancel(self):
+        """Abort the in-flight OCR or translation, closing its streaming request."""
+        self.cancel_event.set()
+        close_streams()
+        logger.info("Screen translation cancel requested")
+    
+    def reset_cancel(self):
+        """Clear a previous cancel request before the user starts new translations."""
+        self.cancel_event.clear()
+    
     @log_function_call
     def reset_cache(self):
         """Reset the image cache."""
-        self.last_image = None
+        self.last_reference = None
         self.last_hwnd = None
+        self.last_frame_digest = None
+        self.pending_frame = None
+        self.translation_cache.clear()
+        reset_capture_methods()
         logger.info("Image cache reset")
\ No newline at end of file
@@ -4,11 +4,14 @@ Service for translating text using LLM models
 
 import re
 import json
-import requests
+import time
 import asyncio
+import queue
+import threading
 from typing import Optional, Generator, Callable
 from datetime import datetime
 from app.utils.logging import get_logger, log_function_call
+from app.utils.http import post_json, open_stream, loads_json
 
 # Initialize logger
 logger = get_logger(__name__)
@@ -19,6 +22,21 @@ LM_STUDIO_API_URL = "http://127.0.0.1:7860/api/v0/chat/completions"  # LM Studio
 DEFAULT_TRANSLATION_MODEL = "gemma-3-12b-it"
 LOG_FILE = "logs/translation_log.txt"
 
+# Translation log records are written by a background thread that keeps the
+# file open, so the translation path never waits on file I/O
+_log_queue: "queue.Queue[tuple]" = queue.Queue()
+_log_writer: Optional[threading.Thread] = None
+_log_writer_lock = threading.Lock()
+
+# Patterns used by extract_translation, compiled once since it runs on every stream chunk
+_CODE_BLOCK_RE = re.compile(r"```.*?```", re.DOTALL)
+_TRANSLATION_RE = re.compile(r'TRANSLATION:\s*([\s\S]+)', re.IGNORECASE)
+_INSTRUCTIONS_RE = re.compile(
+    r"(instructions?:|the above|as requested|no other commentary|do not include).*",
+    re.IGNORECASE | re.DOTALL
+)
+_MARKDOWN_LEAD_RE = re.compile(r"^[#>*\-`]", re.MULTILINE)
+
 @log_function_call
 def extract_translation(content: str) -> str:
     """
@@ -31,10 +49,10 @@ def extract_translation(content: str) -> str:
         Extracted translation text
     """
     # Remove markdown code blocks
-    content = re.sub(r"```.*?```", "", content, flags=re.DOTALL)
+    content = _CODE_BLOCK_RE.sub("", content)
 
     # Look for the TRANSLATION block (case-insensitive)
-    match = re.search(r'TRANSLATION:\s*([\s\S]+)', content, flags=re.IGNORECASE)
+    match = _TRANSLATION_RE.search(content)
     if match:
         translation = match.group(1).strip()
     else:
@@ -42,15 +60,10 @@ def extract_translation(content: str) -> str:
         translation = content.strip()
 
     # Remove common instruction lines or apologies if present
-    translation = re.sub(
-        r"(instructions?:|the above|as requested|no other commentary|do not include).*",
-        "",
-        translation,
-        flags=re.IGNORECASE | re.DOTALL
-    ).strip()
+    translation = _INSTRUCTIONS_RE.sub("", translation).strip()
 
     # Remove any markdown left (accidental formatting)
-    translation = re.sub(r"^[#>*\-`]", "", translation, flags=re.MULTILINE).strip()
+    translation = _MARKDOWN_LEAD_RE.sub("", translation).strip()
 
     logger.debug(f"Extracted translation (length: {len(translation)})")
     return translation
@@ -60,7 +73,8 @@ def stream_translation(
     extracted_text: str, 
     timeout: int = 45, 
     translation_model_id: str = DEFAULT_TRANSLATION_MODEL,
-    stream_callback: Optional[Callable[[str], None]] = None
+    stream_callback: Optional[Callable[[str], None]] = None,
+    cancel_event: Optional[threading.Event] = None
 ) -> str:
     """
     Stream translation of text using LM Studio's native API.
@@ -70,6 +84,7 @@ def stream_translation(
         timeout: API timeout in seconds
         translation_model_id: Model ID for translation
         stream_callback: Optional callback for streaming updates
+        cancel_event: Optional event that aborts the stream when set
         
     Returns:
         Final translation text
@@ -98,7 +113,7 @@ def stream_translation(
     try:
         logger.info(f"Starting streaming translation with model {translation_model_id}")
         
-        with requests.post(LM_STUDIO_API_URL, json=payload, timeout=timeout, stream=True) as resp:
+        with open_stream(LM_STUDIO_API_URL, payload, timeout) as resp:
             resp.raise_for_status()
             
             # Initialize variables to store the accumulated translation
@@ -107,6 +122,11 @@ def stream_translation(
             
             # Process the streaming response
             for line in resp.iter_lines():
+                # Stop reading (and close the connection) as soon as we are cancelled
+                if cancel_event is not None and cancel_event.is_set():
+                    logger.info("Streaming translation cancelled")
+                    break
+                
                 if line:
                     # Parse the SSE data
                     line = line.decode('utf-8')
@@ -119,7 +139,7 @@ def stream_translation(
                         
                         try:
                             # Parse the JSON chunk
-                            chunk = json.loads(data)
+                            chunk = loads_json(data)
                             
                             # Extract the content delta
                             if 'choices' in chunk and len(chunk['choices']) > 0:
@@ -130,8 +150,7 @@ def stream_translation(
                                     accumulated_content += content
                                     
                                     # Call the callback with some rate limiting
-                                    import time
-                                    current_time = time.time()
+                                    current_time = time.monotonic()
                                     if stream_callback and (current_time - last_callback_time >= 0.1):
                                         try:
                                             # Extract partial translation and call callback
@@ -158,7 +177,10 @@ def stream_translation(
             return final_translation
             
     except Exception as e:
-        logger.error(f"Translation API error: {e}")
+        if cancel_event is not None and cancel_event.is_set():
+            logger.info("Streaming translation cancelled")
+        else:
+            logger.error(f"Translation API error: {e}")
         return ""
 
 @log_function_call
@@ -166,7 +188,8 @@ def translate_text(
     text: str, 
     timeout: int = 45, 
     stream_callback: Optional[Callable[[str], None]] = None,
-    translation_model_id: str = DEFAULT_TRANSLATION_MODEL
+    translation_model_id: str = DEFAULT_TRANSLATION_MODEL,
+    cancel_event: Optional[threading.Event] = None
 ) -> str:
     """
     Translate text to English, with optional streaming.
@@ -176,6 +199,7 @@ def translate_text(
         timeout: API timeout in seconds
         stream_callback: Optional callback function for streaming updates
         translation_model_id: Model ID for translation
+        cancel_event: Optional event that aborts a streaming translation when set
         
     Returns:
         The final translation text
@@ -187,7 +211,7 @@ def translate_text(
     # Use streaming translation if callback is provided
     if stream_callback:
         logger.info("Using streaming translation")
-        return stream_translation(text, timeout, translation_model_id, stream_callback)
+        return stream_translation(text, timeout, translation_model_id, stream_callback, cancel_event)
     else:
         # Non-streaming version (fallback)
         logger.info("Using non-streaming translation")
@@ -213,9 +237,9 @@ def translate_text(
         
         try:
             # Use LM Studio native API for non-streaming too
-            resp = requests.post(LM_STUDIO_API_URL, json=payload, timeout=timeout)
+            resp = post_json(LM_STUDIO_API_URL, payload, timeout)
             resp.raise_for_status()
-            content = resp.json()["choices"][0]["message"]["content"].strip()
+            content = loads_json(resp.content)["choices"][0]["message"]["content"].strip()
             translation = extract_translation(content)
             
             # Log the translation
@@ -226,20 +250,56 @@ def translate_text(
             logger.error(f"Translation API error: {e}")
             return ""
 
+def _write_translation_log() -> None:
+    """
+    Append queued translation records to LOG_FILE for the life of the process.
+    
+    Blocks for the next record, then drains whatever else is queued before
+    flushing, so bursts are written with a single flush.
+    """
+    f = None
+    while True:
+        record = _log_queue.get()
+        try:
+            if f is None:
+                f = open(LOG_FILE, "a", encoding="utf-8")
+            while record is not None:
+                ts, original_text, translation_text = record
+                f.write(f"\n{'='*60}\nTimestamp: {ts}\n")
+                f.write(f"Extracted: {original_text}\n")
+                f.write(f"Translation: {translation_text}\n")
+                try:
+                    record = _log_queue.get_nowait()
+                except queue.Empty:
+                    record = None
+            f.flush()
+        except Exception as e:
+            logger.error(f"Logging failed: {e}")
+            if f is not None:
+                f.close()
+                f = None
+
 @log_function_call
 def log_translation(original_text: str, translation_text: str) -> None:
     """
     Log a translation to a file.
     
+    The record is queued and written by a background thread.
+    
     Args:
         original_text: Original text
         translation_text: Translated text
     """
+    global _log_writer
     try:
-        with open(LOG_FILE, "a", encoding="utf-8") as f:
-            ts = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-            f.write(f"\n{'='*60}\nTimestamp: {ts}\n")
-            f.write(f"Extracted: {original_text}\n")
-            f.write(f"Translation: {translation_text}\n")
+        if _log_writer is None:
+            with _log_writer_lock:
+                if _log_writer is None:
+                    _log_writer = threading.Thread(
+                        target=_write_translation_log, name="translation-log", daemon=True
+                    )
+                    _log_writer.start()
+        ts = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        _log_queue.put((ts, original_text, translation_text))
     except Exception as e:
         logger.error(f"Logging failed: {e}")
\ No newline at end of file
@@ -12,17 +12,39 @@ from app.utils.logging import (
 from app.utils.window import (
     get_window_title,
     is_window_visible,
+    is_window_minimized,
+    is_window_cloaked,
+    is_window_capturable,
+    enum_visible_windows,
     get_desktop_window,
     get_window_rect,
+    reset_capture_methods,
     screenshot_window,
     screenshot_desktop,
+    capture_window,
+    capture_desktop,
+)
+
+from app.utils.http import (
+    create_session,
+    http_session,
+    dumps_json,
+    loads_json,
+    post_json,
+    open_stream,
+    close_streams,
 )
 
 from app.utils.image import (
+    ENCODE_MIME_TYPE,
     encode_image,
     decode_image,
     pil_to_cv2,
     cv2_to_pil,
+    preload_image_libraries,
+    frame_digest,
+    SimilarityReference,
+    similarity_reference,
     images_are_similar,
 )
 
@@ -36,15 +58,36 @@ __all__ = [
     # Window utilities
     'get_window_title',
     'is_window_visible',
+    'is_window_minimized',
+    'is_window_cloaked',
+    'is_window_capturable',
+    'enum_visible_windows',
     'get_desktop_window',
     'get_window_rect',
+    'reset_capture_methods',
     'screenshot_window',
     'screenshot_desktop',
+    'capture_window',
+    'capture_desktop',
+    
+    # HTTP utilities
+    'create_session',
+    'http_session',
+    'dumps_json',
+    'loads_json',
+    'post_json',
+    'open_stream',
+    'close_streams',
     
     # Image utilities
+    'ENCODE_MIME_TYPE',
     'encode_image',
     'decode_image',
     'pil_to_cv2',
     'cv2_to_pil',
+    'preload_image_libraries',
+    'frame_digest',
+    'SimilarityReference',
+    'similarity_reference',
     'images_are_similar',
 ]
@@ -0,0 +1,158 @@
+"""
+HTTP utilities for talking to the local LLM server.
+"""
+
+import json
+import threading
+from contextlib import contextmanager
+from typing import Any, Iterator, Set, Union
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from app.utils.logging import get_logger
+
+# orjson serializes the multi-megabyte base64 image payloads several times
+# faster than the standard library; fall back to json when it is missing
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Initialize logger
+logger = get_logger(__name__)
+
+# Headers for request bodies serialized with dumps_json
+JSON_HEADERS = {"Content-Type": "application/json"}
+
+# Retry only failed connection attempts: nothing has reached the server yet,
+# so a POST is safe to reissue, e.g. while LM Studio is still starting up
+CONNECT_RETRIES = 2
+RETRY_BACKOFF = 0.1
+
+# The server is on loopback, so a connection that takes longer than this is
+# not coming; the configured API timeout then only bounds waiting for data
+CONNECT_TIMEOUT = 3.0
+
+def create_session(pool_maxsize: int = 4) -> requests.Session:
+    """
+    Create a requests session with a small keep-alive connection pool.
+    
+    Connection failures are retried with a short backoff; read timeouts and
+    error responses are never retried, since the request may already be
+    generating on the server.
+    
+    Args:
+        pool_maxsize: Maximum number of pooled connections per host
+        
+    Returns:
+        Configured requests session
+    """
+    session = requests.Session()
+    retries = Retry(
+        total=CONNECT_RETRIES,
+        connect=CONNECT_RETRIES,
+        read=0,
+        status=0,
+        other=0,
+        backoff_factor=RETRY_BACKOFF,
+    )
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_maxsize, max_retries=retries)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    logger.debug(f"Created HTTP session with pool size {pool_maxsize}")
+    return session
+
+def dumps_json(payload: Any) -> bytes:
+    """
+    Serialize a request payload to UTF-8 JSON.
+    
+    Args:
+        payload: JSON-serializable object
+        
+    Returns:
+        Encoded JSON body
+    """
+    if orjson is not None:
+        return orjson.dumps(payload)
+    return json.dumps(payload, ensure_ascii=False).encode("utf-8")
+
+def loads_json(data: Union[bytes, str]) -> Any:
+    """
+    Parse a JSON response body or stream chunk.
+    
+    Args:
+        data: JSON text
+        
+    Returns:
+        Parsed object
+        
+    Raises:
+        json.JSONDecodeError: If the data is not valid JSON
+    """
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+# Shared session so OCR, translation and model requests reuse connections
+http_session = create_session()
+
+# Streaming responses currently being read, so close_streams can abort them
+# from another thread while their reader is blocked waiting for data
+_open_streams: Set[requests.Response] = set()
+_open_streams_lock = threading.Lock()
+
+def post_json(url: str, payload: Any, timeout: float, **kwargs) -> requests.Response:
+    """
+    POST a JSON payload on the shared session.
+    
+    Args:
+        url: Request URL
+        payload: JSON-serializable request body
+        timeout: Read timeout in seconds (the longest wait for response data;
+            for streams, between chunks)
+        **kwargs: Extra arguments for requests.Session.post (e.g. stream)
+        
+    Returns:
+        Response object
+    """
+    return http_session.post(url, data=dumps_json(payload), headers=JSON_HEADERS, timeout=(CONNECT_TIMEOUT, timeout), **kwargs)
+
+@contextmanager
+def open_stream(url: str, payload: Any, timeout: float) -> Iterator[requests.Response]:
+    """
+    POST a JSON payload as a streaming request that close_streams can abort.
+    
+    Args:
+        url: Request URL
+        payload: JSON-serializable request body
+        timeout: Read timeout in seconds between chunks
+        
+    Yields:
+        Streaming response object, closed on exit
+    """
+    resp = post_json(url, payload, timeout, stream=True)
+    with _open_streams_lock:
+        _open_streams.add(resp)
+    try:
+        yield resp
+    finally:
+        with _open_streams_lock:
+            _open_streams.discard(resp)
+        resp.close()
+
+def close_streams():
+    """
+    Close every open streaming response.
+    
+    A reader blocked on one of them wakes up with an error, so a cancelled
+    request does not have to run until the server finishes or times out.
+    """
+    with _open_streams_lock:
+        streams = list(_open_streams)
+    for resp in streams:
+        try:
+            resp.close()
+        except Exception as e:
+            logger.debug(f"Error closing streaming response: {e}")
@@ -2,23 +2,67 @@
 Image processing utilities.
 """
 
-import base64
+import hashlib
 import io
-import cv2
+import importlib
+import threading
 import numpy as np
 from PIL import Image
-from typing import Tuple, Optional
+from typing import Optional, NamedTuple, Union
 import logging
 
 from app.utils.logging import get_logger, log_function_call
 
+# pybase64 is a SIMD drop-in for the base64 module, several times faster on
+# multi-megabyte image payloads; fall back to the standard library
+try:
+    import pybase64 as base64
+except ImportError:
+    import base64
+
+# xxh3 hashes raw frames at memory bandwidth; fall back to hashlib's blake2b
+# when xxhash is missing
+try:
+    import xxhash
+except ImportError:
+    xxhash = None
+
 # Initialize logger
 logger = get_logger(__name__)
 
+# Longest side of the grayscale thumbnail kept as a similarity reference
+SIMILARITY_MAX_SIDE = 320
+
+# Mean absolute grey-level difference allowed per unit of (1 - threshold), so
+# the default 0.90 similarity threshold tolerates an average difference of 5
+MAD_PER_THRESHOLD_UNIT = 50.0
+
+# Screenshots are sent to the vision model as high-quality JPEG: several
+# times smaller and faster to encode than PNG. Chroma is kept at full
+# resolution (4:4:4) so thin coloured text does not bleed.
+ENCODE_MIME_TYPE = "image/jpeg"
+JPEG_QUALITY = 90
+
+# Per-thread encoder output buffer. It is rewound rather than recreated, so its
+# capacity is not regrown from zero for every frame.
+_encode_scratch = threading.local()
+
+def preload_image_libraries():
+    """
+    Import OpenCV ahead of its first use.
+    
+    OpenCV is imported lazily because it is the slowest import in the app;
+    call this from a background thread once startup has finished.
+    """
+    try:
+        importlib.import_module("cv2")
+    except Exception as e:
+        logger.error(f"Error preloading image libraries: {e}")
+
 @log_function_call
 def encode_image(image: Image.Image) -> str:
     """
-    Encode a PIL Image to base64.
+    Encode a PIL Image to base64 JPEG (see ENCODE_MIME_TYPE).
     
     Args:
         image: PIL Image to encode
@@ -27,9 +71,19 @@ def encode_image(image: Image.Image) -> str:
         Base64 encoded image string
     """
     try:
-        buffered = io.BytesIO()
-        image.save(buffered, format="PNG")
-        img_str = base64.b64encode(buffered.getvalue()).decode("utf-8")
+        buffered = getattr(_encode_scratch, "buffer", None)
+        if buffered is None:
+            buffered = _encode_scratch.buffer = io.BytesIO()
+        buffered.seek(0)
+        
+        if image.mode not in ("RGB", "L"):
+            image = image.convert("RGB")
+        image.save(buffered, format="JPEG", quality=JPEG_QUALITY, subsampling=0)
+        size = buffered.tell()
+        
+        # Encode straight from the buffer instead of copying it out first; bytes
+        # past size are left over from an earlier, larger frame
+        img_str = base64.b64encode(buffered.getbuffer()[:size]).decode("ascii")
         return img_str
     except Exception as e:
         logger.error(f"Error encoding image: {e}")
@@ -71,6 +125,7 @@ def pil_to_cv2(pil_image: Image.Image) -> np.ndarray:
         
         # Convert RGB to BGR (cv2 format)
         if cv2_image.shape[2] == 3:  # If it has 3 channels (RGB)
+            import cv2
             cv2_image = cv2.cvtColor(cv2_image, cv2.COLOR_RGB2BGR)
         
         return cv2_image
@@ -92,6 +147,7 @@ def cv2_to_pil(cv2_image: np.ndarray) -> Image.Image:
     try:
         # Convert BGR to RGB (PIL format)
         if cv2_image.shape[2] == 3:  # If it has 3 channels (BGR)
+            import cv2
             cv2_image = cv2.cvtColor(cv2_image, cv2.COLOR_BGR2RGB)
         
         # Convert numpy array to PIL Image
@@ -102,68 +158,120 @@ def cv2_to_pil(cv2_image: np.ndarray) -> Image.Image:
         logger.error(f"Error converting cv2 to PIL: {e}")
         return Image.new('RGB', (100, 100), 0)  # Return empty image (black)
 
-@log_function_call
-def images_are_similar(img1: Image.Image, img2: Image.Image, threshold: float = 0.90) -> bool:
+def frame_digest(data) -> int:
     """
-    Check if two images are similar using structural similarity index.
+    Hash the raw pixels of a frame to detect byte-identical captures.
     
     Args:
-        img1: First image
-        img2: Second image
-        threshold: Similarity threshold (0.0 to 1.0)
+        data: Contiguous bytes-like pixel buffer, hashed in place without copying
         
     Returns:
-        True if images are similar, False otherwise
+        64-bit digest as an integer
     """
-    try:
-        # Convert PIL images to cv2 format
-        cv2_img1 = pil_to_cv2(img1)
-        cv2_img2 = pil_to_cv2(img2)
-        
-        # Resize images to the same size if they are different
-        if cv2_img1.shape != cv2_img2.shape:
-            height, width = cv2_img1.shape[:2]
-            cv2_img2 = cv2.resize(cv2_img2, (width, height))
-        
-        # Convert to grayscale
-        gray1 = cv2.cvtColor(cv2_img1, cv2.COLOR_BGR2GRAY)
-        gray2 = cv2.cvtColor(cv2_img2, cv2.COLOR_BGR2GRAY)
-        
-        # Calculate Mean Structural Similarity Index (SSIM)
-        # We'll implement a simplified version of SSIM using NumPy operations
-        
-        # Convert to NumPy arrays for easier calculations
-        gray1_np = np.array(gray1, dtype=np.float64)
-        gray2_np = np.array(gray2, dtype=np.float64)
+    if xxhash is not None:
+        return xxhash.xxh3_64_intdigest(data)
+    return int.from_bytes(hashlib.blake2b(data, digest_size=8).digest(), "big")
+
+def _to_grayscale(image: Image.Image, max_side: Optional[int] = None) -> np.ndarray:
+    """
+    Convert a PIL Image to a single-channel uint8 array.
+    
+    Args:
+        image: PIL Image to convert
+        max_side: If given, first box-downsample by the largest integer factor
+            that keeps the longest side at least this long
         
-        # 1. Calculate mean of each image
-        mean1 = np.mean(gray1_np)
-        mean2 = np.mean(gray2_np)
+    Returns:
+        Grayscale image (numpy array)
+    """
+    if max_side is not None:
+        factor = max(image.width, image.height) // max_side
+        if factor > 1:
+            image = image.reduce(factor)
+    if image.mode == "L":
+        return np.asarray(image)
+    if image.mode != "RGB":
+        image = image.convert("RGB")
+    import cv2
+    return cv2.cvtColor(np.asarray(image), cv2.COLOR_RGB2GRAY)
+
+class SimilarityReference(NamedTuple):
+    """Precomputed grayscale thumbnail of a reference image."""
+    
+    gray: np.ndarray
+
+@log_function_call
+def similarity_reference(image: Image.Image) -> SimilarityReference:
+    """
+    Precompute the data images_are_similar needs for a fixed reference image.
+    
+    The reference keeps only a downsampled grayscale thumbnail, so holding it
+    between checks does not pin a full-resolution capture in memory.
+    
+    Args:
+        image: Reference image that later frames are compared against
         
-        # 2. Calculate variance and covariance
-        # Variance of image1
-        temp1 = gray1_np - mean1
-        variance1 = np.mean(temp1 * temp1)
+    Returns:
+        SimilarityReference for the image
+    """
+    import cv2
+    
+    gray = _to_grayscale(image, SIMILARITY_MAX_SIDE)
+    height, width = gray.shape[:2]
+    scale = SIMILARITY_MAX_SIDE / max(width, height)
+    if scale < 1:
+        size = (max(1, round(width * scale)), max(1, round(height * scale)))
+        gray = cv2.resize(gray, size, interpolation=cv2.INTER_AREA)
+    return SimilarityReference(gray)
+
+@log_function_call
+def images_are_similar(
+    img1: Union[Image.Image, SimilarityReference],
+    img2: Union[Image.Image, SimilarityReference],
+    threshold: float = 0.90
+) -> bool:
+    """
+    Check if two images are similar using the mean absolute difference of
+    their grayscale thumbnails.
+    
+    Args:
+        img1: First image, or a precomputed SimilarityReference for it
+        img2: Second image, or a precomputed SimilarityReference for it
+        threshold: Similarity threshold (0.0 to 1.0); higher values allow
+            smaller differences
         
-        # Variance of image2
-        temp2 = gray2_np - mean2
-        variance2 = np.mean(temp2 * temp2)
+    Returns:
+        True if images are similar, False otherwise
+    """
+    import cv2
+    
+    try:
+        # Reuse the reference's grayscale thumbnail when provided
+        if isinstance(img2, SimilarityReference):
+            reference = img2
+        else:
+            reference = similarity_reference(img2)
         
-        # Covariance
-        covariance = np.mean(temp1 * temp2)
+        # Box-downsample, then convert straight to grayscale (no intermediate BGR copy)
+        if isinstance(img1, SimilarityReference):
+            gray1 = img1.gray
+        else:
+            gray1 = _to_grayscale(img1, SIMILARITY_MAX_SIDE)
         
-        # 3. Constants to stabilize division (standard values from the SSIM paper)
-        C1 = (0.01 * 255)**2
-        C2 = (0.03 * 255)**2
+        # Shrink to the reference thumbnail size if they are different
+        if gray1.shape != reference.gray.shape:
+            height, width = reference.gray.shape[:2]
+            gray1 = cv2.resize(gray1, (width, height), interpolation=cv2.INTER_AREA)
         
-        # 4. Calculate SSIM
-        numerator = (2 * mean1 * mean2 + C1) * (2 * covariance + C2)
-        denominator = (mean1**2 + mean2**2 + C1) * (variance1 + variance2 + C2)
-        score = numerator / denominator
+        # Mean absolute difference of the thumbnails. absdiff saturates on
+        # uint8 without widening, and both reductions run in native code with
+        # the GIL released.
+        mad = cv2.mean(cv2.absdiff(gray1, reference.gray))[0]
+        max_mad = (1.0 - threshold) * MAD_PER_THRESHOLD_UNIT
         
-        logger.debug(f"Image similarity score: {score:.4f}")
+        logger.debug(f"Image mean absolute difference: {mad:.2f} (limit {max_mad:.2f})")
         
-        return bool(score >= threshold)
+        return bool(mad <= max_mad)
     except Exception as e:
         logger.error(f"Error comparing images: {e}")
         return False
@@ -54,13 +54,17 @@ def log_function_call(func: Callable) -> Callable:
     Returns:
         Decorated function
     """
+    logger = get_logger(func.__module__)
+    func_name = func.__qualname__
+    
     @functools.wraps(func)
     def wrapper(*args, **kwargs):
-        logger = get_logger(func.__module__)
-        func_name = func.__qualname__
+        # Only build debug records when they will actually be emitted
+        debug_enabled = logger.isEnabledFor(logging.DEBUG)
         
         # Log function call
-        logger.debug(f"Calling {func_name}")
+        if debug_enabled:
+            logger.debug(f"Calling {func_name}")
         
         # Measure execution time
         start_time = time.time()
@@ -70,8 +74,9 @@ def log_function_call(func: Callable) -> Callable:
             result = func(*args, **kwargs)
             
             # Log successful execution
-            elapsed_time = time.time() - start_time
-            logger.debug(f"{func_name} completed in {elapsed_time:.3f}s")
+            if debug_enabled:
+                elapsed_time = time.time() - start_time
+                logger.debug(f"{func_name} completed in {elapsed_time:.3f}s")
             
             return result
         except Exception as e:
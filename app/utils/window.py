@@ -2,21 +2,304 @@
 Window management utilities.
 """
 
-import win32gui
-import win32ui
 import win32con
 from PIL import Image
 import numpy as np
-from typing import Tuple, Optional
+from typing import Tuple, Optional, Dict, List
 import ctypes
+import threading
 from ctypes import wintypes
 
 from app.utils.logging import get_logger, log_function_call
+from app.utils.image import frame_digest
 
 # Initialize logger
 logger = get_logger(__name__)
 
-@log_function_call
+# DWM attribute reporting whether a window is cloaked (e.g. on another virtual desktop)
+DWMWA_CLOAKED = 14
+
+# PrintWindow flag that forces DWM-composited windows to render their content
+PW_RENDERFULLCONTENT = 2
+
+# GetDIBits constants
+BI_RGB = 0
+DIB_RGB_COLORS = 0
+
+# Capture methods, remembered per window handle
+CAPTURE_BITBLT = "bitblt"
+CAPTURE_PRINTWINDOW = "printwindow"
+_capture_methods: Dict[int, str] = {}
+
+# Samples per side of the grid checked for an all-black BitBlt capture
+BLANK_PROBE_GRID = 64
+
+# Per-thread capture surface (memory DC + DIB section), kept between frames.
+# PIL copies the BGRX data into its own RGB storage, so the DIB can be
+# overwritten by the next capture.
+_scratch = threading.local()
+
+# DXGI Desktop Duplication camera for full-screen grabs, created on first use.
+# dxcam is optional; without it the desktop is captured with GDI like any window.
+_dxcam_camera = None
+_dxcam_unavailable = False
+_dxcam_last_frame: Optional[Image.Image] = None
+_dxcam_last_digest: Optional[int] = None
+_dxcam_lock = threading.Lock()
+
+class BITMAPINFOHEADER(ctypes.Structure):
+    """Win32 BITMAPINFOHEADER structure."""
+    
+    _fields_ = [
+        ("biSize", wintypes.DWORD),
+        ("biWidth", wintypes.LONG),
+        ("biHeight", wintypes.LONG),
+        ("biPlanes", wintypes.WORD),
+        ("biBitCount", wintypes.WORD),
+        ("biCompression", wintypes.DWORD),
+        ("biSizeImage", wintypes.DWORD),
+        ("biXPelsPerMeter", wintypes.LONG),
+        ("biYPelsPerMeter", wintypes.LONG),
+        ("biClrUsed", wintypes.DWORD),
+        ("biClrImportant", wintypes.DWORD),
+    ]
+
+class BITMAPINFO(ctypes.Structure):
+    """Win32 BITMAPINFO structure."""
+    
+    _fields_ = [
+        ("bmiHeader", BITMAPINFOHEADER),
+        ("bmiColors", wintypes.DWORD * 3),
+    ]
+
+# Direct Win32 bindings for the capture hot path. Private WinDLL instances keep
+# these prototypes from leaking into other ctypes.windll users.
+_user32 = ctypes.WinDLL("user32")
+_gdi32 = ctypes.WinDLL("gdi32")
+_dwmapi = ctypes.WinDLL("dwmapi")
+
+_GetWindowDC = _user32.GetWindowDC
+_GetWindowDC.argtypes = [wintypes.HWND]
+_GetWindowDC.restype = wintypes.HDC
+
+_ReleaseDC = _user32.ReleaseDC
+_ReleaseDC.argtypes = [wintypes.HWND, wintypes.HDC]
+_ReleaseDC.restype = ctypes.c_int
+
+_PrintWindow = _user32.PrintWindow
+_PrintWindow.argtypes = [wintypes.HWND, wintypes.HDC, wintypes.UINT]
+_PrintWindow.restype = wintypes.BOOL
+
+WNDENUMPROC = ctypes.WINFUNCTYPE(wintypes.BOOL, wintypes.HWND, wintypes.LPARAM)
+
+_EnumWindows = _user32.EnumWindows
+_EnumWindows.argtypes = [WNDENUMPROC, wintypes.LPARAM]
+_EnumWindows.restype = wintypes.BOOL
+
+_IsWindowVisible = _user32.IsWindowVisible
+_IsWindowVisible.argtypes = [wintypes.HWND]
+_IsWindowVisible.restype = wintypes.BOOL
+
+_IsIconic = _user32.IsIconic
+_IsIconic.argtypes = [wintypes.HWND]
+_IsIconic.restype = wintypes.BOOL
+
+_GetWindowLongW = _user32.GetWindowLongW
+_GetWindowLongW.argtypes = [wintypes.HWND, ctypes.c_int]
+_GetWindowLongW.restype = wintypes.LONG
+
+_DwmGetWindowAttribute = _dwmapi.DwmGetWindowAttribute
+_DwmGetWindowAttribute.argtypes = [wintypes.HWND, wintypes.DWORD, wintypes.LPVOID, wintypes.DWORD]
+_DwmGetWindowAttribute.restype = ctypes.c_long
+
+_GetWindowTextLengthW = _user32.GetWindowTextLengthW
+_GetWindowTextLengthW.argtypes = [wintypes.HWND]
+_GetWindowTextLengthW.restype = ctypes.c_int
+
+_GetWindowTextW = _user32.GetWindowTextW
+_GetWindowTextW.argtypes = [wintypes.HWND, wintypes.LPWSTR, ctypes.c_int]
+_GetWindowTextW.restype = ctypes.c_int
+
+_GetWindowRect = _user32.GetWindowRect
+_GetWindowRect.argtypes = [wintypes.HWND, ctypes.POINTER(wintypes.RECT)]
+_GetWindowRect.restype = wintypes.BOOL
+
+_GetDesktopWindow = _user32.GetDesktopWindow
+_GetDesktopWindow.argtypes = []
+_GetDesktopWindow.restype = wintypes.HWND
+
+_GetForegroundWindow = _user32.GetForegroundWindow
+_GetForegroundWindow.argtypes = []
+_GetForegroundWindow.restype = wintypes.HWND
+
+_GetSystemMetrics = _user32.GetSystemMetrics
+_GetSystemMetrics.argtypes = [ctypes.c_int]
+_GetSystemMetrics.restype = ctypes.c_int
+
+_CreateCompatibleDC = _gdi32.CreateCompatibleDC
+_CreateCompatibleDC.argtypes = [wintypes.HDC]
+_CreateCompatibleDC.restype = wintypes.HDC
+
+_CreateDIBSection = _gdi32.CreateDIBSection
+_CreateDIBSection.argtypes = [
+    wintypes.HDC, ctypes.POINTER(BITMAPINFO), wintypes.UINT,
+    ctypes.POINTER(ctypes.c_void_p), wintypes.HANDLE, wintypes.DWORD,
+]
+_CreateDIBSection.restype = wintypes.HBITMAP
+
+_SelectObject = _gdi32.SelectObject
+_SelectObject.argtypes = [wintypes.HDC, wintypes.HGDIOBJ]
+_SelectObject.restype = wintypes.HGDIOBJ
+
+_BitBlt = _gdi32.BitBlt
+_BitBlt.argtypes = [
+    wintypes.HDC, ctypes.c_int, ctypes.c_int, ctypes.c_int, ctypes.c_int,
+    wintypes.HDC, ctypes.c_int, ctypes.c_int, wintypes.DWORD,
+]
+_BitBlt.restype = wintypes.BOOL
+
+_GdiFlush = _gdi32.GdiFlush
+_GdiFlush.argtypes = []
+_GdiFlush.restype = wintypes.BOOL
+
+_DeleteObject = _gdi32.DeleteObject
+_DeleteObject.argtypes = [wintypes.HGDIOBJ]
+_DeleteObject.restype = wintypes.BOOL
+
+_DeleteDC = _gdi32.DeleteDC
+_DeleteDC.argtypes = [wintypes.HDC]
+_DeleteDC.restype = wintypes.BOOL
+
+def _is_blank_capture(buffer, width: int, height: int) -> bool:
+    """
+    Check whether a BGRX capture is all black.
+    
+    A strided grid across the whole frame is sampled, so the window frame
+    alone cannot decide the result for a black client area.
+    
+    Args:
+        buffer: Raw top-down 32-bit pixel buffer
+        width: Bitmap width
+        height: Bitmap height
+        
+    Returns:
+        True if none of the sampled pixels is visible
+    """
+    pixels = np.frombuffer(buffer, dtype=np.uint8).reshape(height, width, 4)
+    row_stride = max(1, height // BLANK_PROBE_GRID)
+    col_stride = max(1, width // BLANK_PROBE_GRID)
+    return not np.any(pixels[::row_stride, ::col_stride, :3])
+
+class _CaptureSurface:
+    """Memory DC with a top-down 32-bit DIB section selected into it."""
+    
+    def __init__(self, width: int, height: int):
+        bmi = BITMAPINFO()
+        bmi.bmiHeader.biSize = ctypes.sizeof(BITMAPINFOHEADER)
+        bmi.bmiHeader.biWidth = width
+        bmi.bmiHeader.biHeight = -height  # Negative height requests top-down rows
+        bmi.bmiHeader.biPlanes = 1
+        bmi.bmiHeader.biBitCount = 32
+        bmi.bmiHeader.biCompression = BI_RGB
+        
+        self.width = width
+        self.height = height
+        self.mem_dc = _CreateCompatibleDC(None)
+        bits = ctypes.c_void_p()
+        self.bitmap = _CreateDIBSection(self.mem_dc, ctypes.byref(bmi), DIB_RGB_COLORS, ctypes.byref(bits), None, 0)
+        if not self.bitmap or not bits.value:
+            _DeleteDC(self.mem_dc)
+            raise OSError("CreateDIBSection failed")
+        self.old_bitmap = _SelectObject(self.mem_dc, self.bitmap)
+        
+        # View onto the DIB's own memory; GDI draws straight into it
+        self.pixels = (ctypes.c_char * (width * height * 4)).from_address(bits.value)
+    
+    def release(self):
+        """Free the DC and DIB section."""
+        _SelectObject(self.mem_dc, self.old_bitmap)
+        _DeleteObject(self.bitmap)
+        _DeleteDC(self.mem_dc)
+
+def _get_capture_surface(width: int, height: int) -> _CaptureSurface:
+    """
+    Get this thread's capture surface, recreating it only when the size changes.
+    
+    Args:
+        width: Capture width
+        height: Capture height
+        
+    Returns:
+        Capture surface of exactly width x height pixels
+    """
+    surface = getattr(_scratch, "surface", None)
+    if surface is None or surface.width != width or surface.height != height:
+        if surface is not None:
+            _scratch.surface = None
+            surface.release()
+        surface = _CaptureSurface(width, height)
+        _scratch.surface = surface
+    return surface
+
+def _capture_window_dc(hwnd: int, width: int, height: int, method: str, probe: bool = True) -> Tuple[ctypes.Array, str]:
+    """
+    Capture a window's device context into a pixel buffer.
+    
+    Args:
+        hwnd: Window handle
+        width: Capture width
+        height: Capture height
+        method: Capture method to try first
+        probe: Whether to fall back to PrintWindow when BitBlt comes back blank
+        
+    Returns:
+        Tuple of (BGRX pixel buffer, capture method that produced it). The
+        buffer is overwritten by this thread's next capture.
+    """
+    surface = _get_capture_surface(width, height)
+    hwnd_dc = _GetWindowDC(hwnd)
+    try:
+        if method == CAPTURE_BITBLT:
+            _BitBlt(surface.mem_dc, 0, 0, width, height, hwnd_dc, 0, 0, win32con.SRCCOPY)
+            _GdiFlush()
+            if not probe or not _is_blank_capture(surface.pixels, width, height):
+                return surface.pixels, method
+            
+            logger.debug("BitBlt returned a blank frame, retrying with PrintWindow")
+            method = CAPTURE_PRINTWINDOW
+        
+        if not _PrintWindow(hwnd, surface.mem_dc, PW_RENDERFULLCONTENT):
+            logger.warning("PrintWindow failed, falling back to BitBlt")
+            _BitBlt(surface.mem_dc, 0, 0, width, height, hwnd_dc, 0, 0, win32con.SRCCOPY)
+            method = CAPTURE_BITBLT
+        
+        _GdiFlush()
+        return surface.pixels, method
+    finally:
+        # Clean up
+        _ReleaseDC(hwnd, hwnd_dc)
+
+def reset_capture_methods():
+    """Forget the capture method learned for each window, so they are probed again."""
+    _capture_methods.clear()
+
+def _read_window_text(hwnd: int) -> str:
+    """
+    Read a window's title with GetWindowTextW, sizing the buffer from its length.
+    
+    Args:
+        hwnd: Window handle
+        
+    Returns:
+        Window title, or an empty string if it has none
+    """
+    length = _GetWindowTextLengthW(hwnd)
+    if not length:
+        return ""
+    buffer = ctypes.create_unicode_buffer(length + 1)
+    _GetWindowTextW(hwnd, buffer, length + 1)
+    return buffer.value
+
 def get_window_title(hwnd: int) -> str:
     """
     Get the title of a window.
@@ -28,12 +311,11 @@ def get_window_title(hwnd: int) -> str:
         Window title
     """
     try:
-        return win32gui.GetWindowText(hwnd)
+        return _read_window_text(hwnd)
     except Exception as e:
         logger.error(f"Error getting window title: {e}")
         return ""
 
-@log_function_call
 def is_window_visible(hwnd: int) -> bool:
     """
     Check if a window is visible.
@@ -45,12 +327,94 @@ def is_window_visible(hwnd: int) -> bool:
         True if the window is visible, False otherwise
     """
     try:
-        return bool(win32gui.IsWindowVisible(hwnd))
+        return bool(_IsWindowVisible(hwnd))
     except Exception as e:
         logger.error(f"Error checking window visibility: {e}")
         return False
 
-@log_function_call
+def is_window_minimized(hwnd: int) -> bool:
+    """
+    Check if a window is minimized.
+    
+    Args:
+        hwnd: Window handle
+        
+    Returns:
+        True if the window is minimized, False otherwise
+    """
+    try:
+        return bool(_IsIconic(hwnd))
+    except Exception as e:
+        logger.error(f"Error checking window minimized state: {e}")
+        return False
+
+def is_window_cloaked(hwnd: int) -> bool:
+    """
+    Check if a window is cloaked by DWM (hidden UWP apps, other virtual desktops).
+    
+    Args:
+        hwnd: Window handle
+        
+    Returns:
+        True if the window is cloaked, False otherwise
+    """
+    try:
+        cloaked = ctypes.c_int(0)
+        result = _DwmGetWindowAttribute(
+            hwnd,
+            DWMWA_CLOAKED,
+            ctypes.byref(cloaked),
+            ctypes.sizeof(cloaked)
+        )
+        return result == 0 and cloaked.value != 0
+    except Exception as e:
+        logger.error(f"Error checking window cloaked state: {e}")
+        return False
+
+def is_window_capturable(hwnd: int) -> bool:
+    """
+    Check if a window is currently showing content worth capturing.
+    
+    Args:
+        hwnd: Window handle
+        
+    Returns:
+        True if the window is visible, not minimized and not cloaked
+    """
+    # For a top-level window, WS_VISIBLE and WS_MINIMIZE in its style are what
+    # IsWindowVisible and IsIconic report, so one call answers both. The DWM
+    # query only runs for windows that are on screen.
+    try:
+        style = _GetWindowLongW(hwnd, win32con.GWL_STYLE)
+    except Exception as e:
+        logger.error(f"Error reading window style: {e}")
+        return False
+    if not style & win32con.WS_VISIBLE or style & win32con.WS_MINIMIZE:
+        return False
+    return not is_window_cloaked(hwnd)
+
+def enum_visible_windows() -> List[Tuple[int, str]]:
+    """
+    Enumerate visible top-level windows that have a title.
+    
+    Returns:
+        List of (hwnd, title) tuples
+    """
+    windows = []
+    
+    def callback(hwnd, _):
+        if _IsWindowVisible(hwnd):
+            title = _read_window_text(hwnd)
+            if title:
+                windows.append((hwnd, title))
+        return True
+    
+    try:
+        _EnumWindows(WNDENUMPROC(callback), 0)
+    except Exception as e:
+        logger.error(f"Error enumerating windows: {e}")
+    return windows
+
 def get_desktop_window() -> int:
     """
     Get the desktop window handle.
@@ -58,9 +422,8 @@ def get_desktop_window() -> int:
     Returns:
         Desktop window handle
     """
-    return win32gui.GetDesktopWindow()
+    return _GetDesktopWindow() or 0
 
-@log_function_call
 def get_window_rect(hwnd: int) -> Tuple[int, int, int, int]:
     """
     Get the rectangle of a window.
@@ -72,7 +435,10 @@ def get_window_rect(hwnd: int) -> Tuple[int, int, int, int]:
         Tuple of (left, top, right, bottom)
     """
     try:
-        return win32gui.GetWindowRect(hwnd)
+        rect = wintypes.RECT()
+        if not _GetWindowRect(hwnd, ctypes.byref(rect)):
+            raise OSError(f"GetWindowRect failed for window {hwnd}")
+        return (rect.left, rect.top, rect.right, rect.bottom)
     except Exception as e:
         logger.error(f"Error getting window rect: {e}")
         return (0, 0, 0, 0)
@@ -88,53 +454,108 @@ def screenshot_window(hwnd: int) -> Image.Image:
     Returns:
         PIL Image of the window
     """
-    try:
-        # Get window dimensions
-        left, top, right, bottom = get_window_rect(hwnd)
-        width = right - left
-        height = bottom - top
+    return capture_window(hwnd)[0]
+
+@log_function_call
+def capture_window(hwnd: int) -> Tuple[Image.Image, Optional[int]]:
+    """
+    Take a screenshot of a window along with a digest of its raw pixels.
+    
+    The digest is taken straight from the capture buffer, before the pixels
+    are copied into the PIL image, so identical frames can be detected
+    without another full-frame copy.
+    
+    Args:
+        hwnd: Window handle
         
+    Returns:
+        Tuple of (PIL Image of the window, frame digest). The digest is None
+        if the capture failed.
+    """
+    try:
         # Check if it's the desktop window
         if hwnd == get_desktop_window():
             # For desktop, use a different approach
-            return screenshot_desktop()
+            return capture_desktop()
         
-        # Create device context
-        hwnd_dc = win32gui.GetWindowDC(hwnd)
-        mfc_dc = win32ui.CreateDCFromHandle(hwnd_dc)
-        save_dc = mfc_dc.CreateCompatibleDC()
-        
-        # Create bitmap
-        save_bitmap = win32ui.CreateBitmap()
-        save_bitmap.CreateCompatibleBitmap(mfc_dc, width, height)
-        save_dc.SelectObject(save_bitmap)
-        
-        # Copy window contents to bitmap
-        result = ctypes.windll.user32.PrintWindow(hwnd, save_dc.GetSafeHdc(), 2)
-        if not result:
-            logger.warning("PrintWindow failed, falling back to BitBlt")
-            save_dc.BitBlt((0, 0), (width, height), mfc_dc, (0, 0), win32con.SRCCOPY)
-        
-        # Convert to PIL Image
-        bmpinfo = save_bitmap.GetInfo()
-        bmpstr = save_bitmap.GetBitmapBits(True)
-        img = Image.frombuffer(
-            'RGB',
-            (bmpinfo['bmWidth'], bmpinfo['bmHeight']),
-            bmpstr, 'raw', 'BGRX', 0, 1
-        )
+        # Get window dimensions
+        left, top, right, bottom = get_window_rect(hwnd)
+        width = right - left
+        height = bottom - top
         
-        # Clean up
-        save_dc.DeleteDC()
-        mfc_dc.DeleteDC()
-        win32gui.ReleaseDC(hwnd, hwnd_dc)
-        win32gui.DeleteObject(save_bitmap.GetHandle())
+        # Copy window contents. BitBlt is much cheaper than a full PrintWindow
+        # re-render, so try it first unless this window is known to need
+        # PrintWindow (DWM-composited windows come back all black).
+        method = _capture_methods.get(hwnd, CAPTURE_BITBLT)
+        if method == CAPTURE_BITBLT and _GetForegroundWindow() != hwnd:
+            # BitBlt copies what is on screen, so windows covering a background
+            # window would end up in the frame; have it render itself instead.
+            # The remembered method is left alone for when it is in front again.
+            buffer, _ = _capture_window_dc(hwnd, width, height, CAPTURE_PRINTWINDOW)
+        else:
+            buffer, method = _capture_window_dc(hwnd, width, height, method)
+            _capture_methods[hwnd] = method
         
-        return img
+        # Hash the raw capture, then convert to PIL Image
+        digest = frame_digest(buffer)
+        return Image.frombuffer('RGB', (width, height), buffer, 'raw', 'BGRX', 0, 1), digest
     except Exception as e:
         logger.error(f"Error taking screenshot: {e}")
         # Return a blank image
-        return Image.new('RGB', (800, 600), color='white')
+        return Image.new('RGB', (800, 600), color='white'), None
+
+def _get_dxcam_camera():
+    """
+    Get the shared DXcam camera for the primary output, creating it on first use.
+    
+    Returns:
+        DXcam camera, or None if dxcam is not installed or cannot be initialized
+    """
+    global _dxcam_camera, _dxcam_unavailable
+    if _dxcam_camera is None and not _dxcam_unavailable:
+        try:
+            import dxcam
+            _dxcam_camera = dxcam.create(output_color="RGB")
+        except Exception as e:
+            logger.info(f"DXcam unavailable, capturing the desktop with GDI: {e}")
+        if _dxcam_camera is None:
+            _dxcam_unavailable = True
+    return _dxcam_camera
+
+def _grab_dxcam_frame() -> Optional[Tuple[Image.Image, Optional[int]]]:
+    """
+    Grab the desktop with DXcam. Must be called with _dxcam_lock held.
+    
+    On a DXGI failure (e.g. after a display mode change) the camera and its
+    last frame are dropped, so the caller falls back to GDI and the camera
+    is recreated on the next call.
+    
+    Returns:
+        Tuple of (frame, digest), or None if DXcam has no frame to offer
+    """
+    global _dxcam_camera, _dxcam_last_frame, _dxcam_last_digest
+    camera = _get_dxcam_camera()
+    if camera is None:
+        return None
+    try:
+        frame = camera.grab()
+        if frame is not None:
+            frame = np.ascontiguousarray(frame)
+            _dxcam_last_digest = frame_digest(frame)
+            _dxcam_last_frame = Image.fromarray(frame)
+    except Exception as e:
+        logger.warning(f"DXcam capture failed, falling back to GDI: {e}")
+        try:
+            camera.release()
+        except Exception:
+            pass
+        _dxcam_camera = None
+        _dxcam_last_frame = None
+        _dxcam_last_digest = None
+        return None
+    if _dxcam_last_frame is None:
+        return None
+    return _dxcam_last_frame, _dxcam_last_digest
 
 @log_function_call
 def screenshot_desktop() -> Image.Image:
@@ -144,42 +565,40 @@ def screenshot_desktop() -> Image.Image:
     Returns:
         PIL Image of the desktop
     """
+    return capture_desktop()[0]
+
+@log_function_call
+def capture_desktop() -> Tuple[Image.Image, Optional[int]]:
+    """
+    Take a screenshot of the desktop along with a digest of its raw pixels.
+    
+    Returns:
+        Tuple of (PIL Image of the desktop, frame digest). The digest is None
+        if the capture failed.
+    """
     try:
+        # Desktop Duplication hands back the composed frame without a GDI copy.
+        # grab() returns None when nothing changed since its last frame, so the
+        # previous frame is returned as is; GDI is only used without DXcam, before
+        # its first frame or after it fails, keeping the frame size consistent.
+        with _dxcam_lock:
+            captured = _grab_dxcam_frame()
+        if captured is not None:
+            return captured
+        
         # Get screen dimensions
-        user32 = ctypes.windll.user32
-        screen_width = user32.GetSystemMetrics(0)
-        screen_height = user32.GetSystemMetrics(1)
-        
-        # Create device context
-        hwnd_dc = win32gui.GetWindowDC(get_desktop_window())
-        mfc_dc = win32ui.CreateDCFromHandle(hwnd_dc)
-        save_dc = mfc_dc.CreateCompatibleDC()
-        
-        # Create bitmap
-        save_bitmap = win32ui.CreateBitmap()
-        save_bitmap.CreateCompatibleBitmap(mfc_dc, screen_width, screen_height)
-        save_dc.SelectObject(save_bitmap)
-        
-        # Copy screen contents to bitmap
-        save_dc.BitBlt((0, 0), (screen_width, screen_height), mfc_dc, (0, 0), win32con.SRCCOPY)
-        
-        # Convert to PIL Image
-        bmpinfo = save_bitmap.GetInfo()
-        bmpstr = save_bitmap.GetBitmapBits(True)
-        img = Image.frombuffer(
-            'RGB',
-            (bmpinfo['bmWidth'], bmpinfo['bmHeight']),
-            bmpstr, 'raw', 'BGRX', 0, 1
-        )
+        screen_width = _GetSystemMetrics(0)
+        screen_height = _GetSystemMetrics(1)
         
-        # Clean up
-        save_dc.DeleteDC()
-        mfc_dc.DeleteDC()
-        win32gui.ReleaseDC(get_desktop_window(), hwnd_dc)
-        win32gui.DeleteObject(save_bitmap.GetHandle())
+        # Copy screen contents
+        buffer, _ = _capture_window_dc(
+            get_desktop_window(), screen_width, screen_height, CAPTURE_BITBLT, probe=False
+        )
         
-        return img
+        # Hash the raw capture, then convert to PIL Image
+        digest = frame_digest(buffer)
+        return Image.frombuffer('RGB', (screen_width, screen_height), buffer, 'raw', 'BGRX', 0, 1), digest
     except Exception as e:
         logger.error(f"Error taking desktop screenshot: {e}")
         # Return a blank image
-        return Image.new('RGB', (800, 600), color='white')
+        return Image.new('RGB', (800, 600), color='white'), None
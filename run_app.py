@@ -43,17 +43,15 @@ class DesktopApp:
         self.server_thread = threading.Thread(target=run_server, daemon=True)
         self.server_thread.start()
         
-        # Wait for server to start
-        max_attempts = 30
-        for i in range(max_attempts):
-            try:
-                import requests
-                response = requests.get(f"http://127.0.0.1:{self.port}/health", timeout=1)
-                if response.status_code == 200:
-                    logger.info("Server started successfully")
-                    return True
-            except:
-                time.sleep(0.1)
+        # Wait for uvicorn to finish startup (it sets server.started once listening)
+        deadline = time.monotonic() + 5
+        while time.monotonic() < deadline:
+            if self.server.started:
+                logger.info("Server started successfully")
+                return True
+            if not self.server_thread.is_alive():
+                break
+            time.sleep(0.01)
         
         logger.error("Failed to start server")
         return False
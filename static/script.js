@@ -5,6 +5,23 @@ class ScreenTranslatorApp {
         this.reconnectAttempts = 0;
         this.maxReconnectAttempts = 5;
         this.translations = new Map();
+        // Rendered box per translation id, so updates never search the DOM
+        this.translationBoxes = new Map();
+        // Keep in sync with MAX_STORED_RESULTS on the server
+        this.maxResults = 200;
+        // Results received since the last animation frame, latest per id
+        this.pendingResults = new Map();
+        // Local elapsed-time ticker, only running while a task is in progress
+        this.progressTimer = null;
+        this.progressLabel = null;
+        this.taskStartedAt = 0;
+        this.scrollPending = false;
+        // Building a locale formatter is expensive, so create it once
+        this.timeFormatter = new Intl.DateTimeFormat(undefined, {
+            hour: 'numeric',
+            minute: 'numeric',
+            second: 'numeric'
+        });
         
         this.initWebSocket();
         this.initEventListeners();
@@ -46,7 +63,7 @@ class ScreenTranslatorApp {
     handleWebSocketMessage(message) {
         switch (message.type) {
             case 'translation_result':
-                this.addTranslationResult(message.data);
+                this.queueTranslationResult(message.data);
                 break;
             case 'status_update':
                 this.updateStatus(message.data);
@@ -92,13 +109,6 @@ class ScreenTranslatorApp {
                 // Show empty state if results fail to load
                 this.showEmptyState();
             }
-
-            // Load windows
-            try {
-                await this.loadWindows();
-            } catch (windowsError) {
-                console.error('Failed to load windows:', windowsError);
-            }
         } catch (error) {
             this.showError('Failed to load initial data', error.message);
         }
@@ -116,20 +126,23 @@ class ScreenTranslatorApp {
 
     populateWindowDropdown(windows) {
         const dropdown = document.getElementById('windowDropdown');
-        dropdown.innerHTML = '';
+
+        // Build the options off-DOM and swap them in with a single reflow.
+        // Clicks are handled by one delegated listener reading data-hwnd.
+        const fragment = document.createDocumentFragment();
 
         // Add full screen option
         const fullScreenOption = document.createElement('a');
         fullScreenOption.href = '#';
         fullScreenOption.textContent = 'Full Screen';
-        fullScreenOption.onclick = () => this.selectWindow(null, 'Full Screen');
-        dropdown.appendChild(fullScreenOption);
+        fullScreenOption.dataset.hwnd = '';
+        fragment.appendChild(fullScreenOption);
 
         // Add separator
         const separator = document.createElement('div');
         separator.style.borderTop = '1px solid var(--border)';
         separator.style.margin = '8px 0';
-        dropdown.appendChild(separator);
+        fragment.appendChild(separator);
 
         // Add windows
         windows.forEach(window => {
@@ -137,10 +150,12 @@ class ScreenTranslatorApp {
                 const option = document.createElement('a');
                 option.href = '#';
                 option.textContent = window.title;
-                option.onclick = () => this.selectWindow(window.hwnd, window.title);
-                dropdown.appendChild(option);
+                option.dataset.hwnd = window.hwnd;
+                fragment.appendChild(option);
             }
         });
+
+        dropdown.replaceChildren(fragment);
     }
 
     async selectWindow(hwnd, title) {
@@ -193,14 +208,46 @@ class ScreenTranslatorApp {
 
     updateTaskProgress(taskState) {
         const progressElement = document.getElementById('taskProgress');
-        if (taskState.is_running) {
+        if (!taskState.is_running) {
+            clearInterval(this.progressTimer);
+            this.progressTimer = null;
+            this.progressLabel = null;
+            progressElement.innerHTML = '';
+            return;
+        }
+
+        // Anchor the local clock to the server's elapsed time; the server only
+        // resyncs occasionally and the display ticks locally in between
+        this.taskStartedAt = performance.now() - taskState.elapsed_time * 1000;
+        if (!this.progressTimer) {
             progressElement.innerHTML = `
-                <span>Processing... ${taskState.elapsed_time.toFixed(1)}s</span>
+                <span></span>
                 <div class="processing-indicator"></div>
             `;
-        } else {
-            progressElement.innerHTML = '';
+            this.progressLabel = progressElement.querySelector('span');
+            this.progressTimer = setInterval(() => this.renderElapsedTime(), 100);
         }
+        this.renderElapsedTime();
+    }
+
+    renderElapsedTime() {
+        const elapsed = (performance.now() - this.taskStartedAt) / 1000;
+        this.progressLabel.textContent = `Processing... ${elapsed.toFixed(1)}s`;
+    }
+
+    queueTranslationResult(result) {
+        // Apply a burst of results in one DOM pass per frame; a streaming
+        // result only needs its newest snapshot rendered
+        const flushScheduled = this.pendingResults.size > 0;
+        this.pendingResults.set(result.id, result);
+        if (flushScheduled) {
+            return;
+        }
+        requestAnimationFrame(() => {
+            const results = Array.from(this.pendingResults.values());
+            this.pendingResults.clear();
+            results.forEach(pending => this.addTranslationResult(pending));
+        });
     }
 
     addTranslationResult(result) {
@@ -209,30 +256,24 @@ class ScreenTranslatorApp {
         
         const container = document.getElementById('resultsContainer');
         
-        // Remove empty state if it exists
-        const emptyState = container.querySelector('.empty-state');
-        if (emptyState) {
+        // Remove empty state if it exists (it is always the only child)
+        const emptyState = container.firstElementChild;
+        if (emptyState && emptyState.classList.contains('empty-state')) {
             emptyState.remove();
         }
         
         // Check if this is an update to an existing translation
         if (!isNew) {
             // Find the existing box
-            const existingBox = container.querySelector(`[data-translation-id="${result.id}"]`);
+            const existingBox = this.translationBoxes.get(result.id);
             if (existingBox) {
                 // Update just the content
                 const contentDiv = existingBox.querySelector('.translation-content');
-                contentDiv.innerHTML = this.escapeHtml(result.translation);
+                this.updateTranslationContent(contentDiv, result.translation);
                 
                 // Update the timestamp and processing time
                 const timestampDiv = existingBox.querySelector('.translation-timestamp');
-                timestampDiv.innerHTML = `
-                    ${new Date(result.timestamp).toLocaleTimeString()}
-                    ${result.processing_time ? `(${result.processing_time.toFixed(1)}s)` : ''}
-                    ${result.is_streaming ? 
-                        `<span class="streaming-indicator">${result.stage === 'ocr' ? 'Running OCR...' : 'Translating...'}</span>` 
-                        : ''}
-                `;
+                timestampDiv.innerHTML = this.formatTimestamp(result);
                 
                 // Add or remove streaming class
                 if (result.is_streaming) {
@@ -249,20 +290,17 @@ class ScreenTranslatorApp {
         const box = document.createElement('div');
         box.className = `translation-box ${result.is_streaming ? 'streaming' : ''}`;
         box.setAttribute('data-translation-id', result.id);
+        box.style.containIntrinsicSize = `auto ${this.estimateBoxHeight(result.translation)}px`;
         box.innerHTML = `
             <div class="translation-header">
                 <div class="translation-timestamp">
-                    ${new Date(result.timestamp).toLocaleTimeString()}
-                    ${result.processing_time ? `(${result.processing_time.toFixed(1)}s)` : ''}
-                    ${result.is_streaming ? 
-                        `<span class="streaming-indicator">${result.stage === 'ocr' ? 'Running OCR...' : 'Translating...'}</span>` 
-                        : ''}
+                    ${this.formatTimestamp(result)}
                 </div>
                 <div class="translation-actions">
-                    <button class="btn btn-secondary btn-icon" onclick="app.copyTranslation('${result.id}')" title="Copy">
+                    <button class="btn btn-secondary btn-icon" data-action="copy" title="Copy">
                         📋
                     </button>
-                    <button class="btn btn-danger btn-icon" onclick="app.deleteTranslation('${result.id}')" title="Delete">
+                    <button class="btn btn-danger btn-icon" data-action="delete" title="Delete">
                         🗑️
                     </button>
                 </div>
@@ -272,9 +310,63 @@ class ScreenTranslatorApp {
 
         // Add to top of container
         container.insertBefore(box, container.firstChild);
+        this.translationBoxes.set(result.id, box);
+
+        // Evict the bottom-most boxes once over the limit
+        while (this.translationBoxes.size > this.maxResults) {
+            const oldestBox = container.lastElementChild;
+            const oldestId = oldestBox.getAttribute('data-translation-id');
+            oldestBox.remove();
+            this.translationBoxes.delete(oldestId);
+            this.translations.delete(oldestId);
+        }
 
         // Scroll to top
-        container.scrollTop = 0;
+        this.scheduleScrollToTop();
+    }
+
+    estimateBoxHeight(text) {
+        // Placeholder height for boxes the browser has not laid out yet (see
+        // content-visibility in style.css), from the text alone: ~60 chars per
+        // wrapped 24px line plus the header and padding. Once a box has been
+        // rendered, the browser remembers its real size instead.
+        const lines = text.split('\n').length + Math.floor(text.length / 60);
+        return 90 + lines * 24;
+    }
+
+    scheduleScrollToTop() {
+        // Coalesce bursts of new boxes into a single layout and scroll per frame
+        if (this.scrollPending) {
+            return;
+        }
+        this.scrollPending = true;
+        requestAnimationFrame(() => {
+            this.scrollPending = false;
+            document.getElementById('resultsContainer').scrollTop = 0;
+        });
+    }
+
+    formatTimestamp(result) {
+        return `
+            ${this.timeFormatter.format(new Date(result.timestamp))}
+            ${result.processing_time ? `(${result.processing_time.toFixed(1)}s)` : ''}
+            ${result.is_streaming ? 
+                `<span class="streaming-indicator">${result.stage === 'ocr' ? 'Running OCR...' : 'Translating...'}</span>` 
+                : ''}
+        `;
+    }
+
+    updateTranslationContent(contentDiv, text) {
+        // Streaming updates usually extend the previous text, so append only
+        // the new tail instead of re-rendering the whole block
+        const previous = contentDiv.textContent;
+        if (text.startsWith(previous)) {
+            if (text.length > previous.length) {
+                contentDiv.appendChild(document.createTextNode(text.slice(previous.length)));
+            }
+        } else {
+            contentDiv.textContent = text;
+        }
     }
 
     async copyTranslation(id) {
@@ -295,13 +387,11 @@ class ScreenTranslatorApp {
             this.translations.delete(id);
             
             // Remove from DOM
-            const boxes = document.querySelectorAll('.translation-box');
-            boxes.forEach(box => {
-                const deleteBtn = box.querySelector(`[onclick="app.deleteTranslation('${id}')"]`);
-                if (deleteBtn) {
-                    box.remove();
-                }
-            });
+            const box = this.translationBoxes.get(id);
+            if (box) {
+                box.remove();
+                this.translationBoxes.delete(id);
+            }
 
             // Show empty state if no translations left
             if (this.translations.size === 0) {
@@ -364,6 +454,7 @@ class ScreenTranslatorApp {
         try {
             await fetch('/api/results', { method: 'DELETE' });
             this.translations.clear();
+            this.translationBoxes.clear();
             this.showEmptyState();
             this.showSuccess('Results cleared successfully');
         } catch (error) {
@@ -388,6 +479,32 @@ class ScreenTranslatorApp {
             await this.saveSettings();
         });
 
+        // Handle copy/delete for all translation boxes with one delegated listener
+        document.getElementById('resultsContainer').addEventListener('click', (e) => {
+            const button = e.target.closest('[data-action]');
+            if (!button) {
+                return;
+            }
+            const box = button.closest('.translation-box');
+            const id = box.getAttribute('data-translation-id');
+            if (button.dataset.action === 'copy') {
+                this.copyTranslation(id);
+            } else if (button.dataset.action === 'delete') {
+                this.deleteTranslation(id);
+            }
+        });
+
+        // Handle window selection for all dropdown options with one delegated listener
+        document.getElementById('windowDropdown').addEventListener('click', (e) => {
+            const option = e.target.closest('[data-hwnd]');
+            if (!option) {
+                return;
+            }
+            e.preventDefault();
+            const hwnd = option.dataset.hwnd ? Number(option.dataset.hwnd) : null;
+            this.selectWindow(hwnd, option.textContent);
+        });
+
         // Close dropdown when clicking outside
         document.addEventListener('click', (e) => {
             const dropdown = document.getElementById('windowDropdown');
@@ -533,7 +650,7 @@ class ScreenTranslatorApp {
             return;
         }
 
-        // Populate windows
+        // Populate windows lazily, only when the dropdown is opened
         this.loadWindows();
 
         // Position the dropdown